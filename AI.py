@@ -1,100 +1,134 @@
 # AI.py
 
-from copy import deepcopy
-from game import Game
-from board import Piece
+import json
+import os
+from itertools import chain, islice
+from board import ALL_DIRECTIONS, JUMP_TARGET, NEIGHBOR, PLAYABLE_SQUARES, square_index
+from sharedtt import EXACT, LOWER, UPPER, SharedTranspositionTable
 
+# Evaluation weights: value of a man and a king, bonus per row advanced and
+# bonus for standing on a side edge. tuning.py fits these to game results
+# and writes them to WEIGHTS_FILE, which is loaded once at startup.
+DEFAULT_WEIGHTS = {"man": 1.0, "king": 1.5, "advance": 0.1, "edge": 0.2}
+WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights.json")
 
-class MinimaxAI:
-    def __init__(self, color, max_depth=1):  # Reduced default depth for better performance
-        self.color = color
-        self.max_depth = max_depth
-
-    def choose_move(self, game):
-        """Choose the best move using minimax algorithm with alpha-beta pruning."""
-        # Work on a clone of the board so we never touch the real one
-        board_copy = deepcopy(game.board)
-
-        def minimax(state, depth, alpha, beta, maximizing):
-            # Base case: reached max depth or no pieces left
-            if depth == 0 or state.is_terminal():
-                return self.evaluate(state), None
 
-            best_move = None
-            if maximizing:
-                max_eval = float('-inf')
-                for move in self.get_valid_moves_with_pieces(state, self.color):
-                    p_clone, (tr, tc), captured = move
+def load_weights(path=WEIGHTS_FILE):
+    """Return the evaluation weights stored at `path`, or the defaults."""
+    weights = dict(DEFAULT_WEIGHTS)
+    if os.path.exists(path):
+        with open(path) as f:
+            weights.update({name: float(value) for name, value in json.load(f).items()
+                            if name in DEFAULT_WEIGHTS})
+    return weights
 
-                    # Skip invalid moves
-                    if not isinstance(p_clone, Piece):
-                        continue
 
-                    # Create a deep copy of the board to simulate the move
-                    next_state = deepcopy(state)
+EVAL_WEIGHTS = load_weights()
 
-                    # Get the copy of the piece from the copied board
-                    from_r, from_c = p_clone.row, p_clone.col
-                    piece_copy = next_state.board[from_r][from_c]
 
-                    # Make the move on the copied board
-                    next_state.make_move((piece_copy, (tr, tc), captured))
+# Width of the null window used to test moves after the first one (PVS)
+NULL_WINDOW = 1e-6
+# Half-width of the window placed around the previous iteration's score
+ASPIRATION_WINDOW = 0.5
+INF = float('inf')
 
-                    # Evaluate the resulting position
-                    eval_score, _ = minimax(
-                        next_state, depth-1, alpha, beta, False)
+# Late move reductions: quiet moves after the first LMR_FULL_MOVES are
+# searched LMR_REDUCTION plies shallower when at least LMR_MIN_DEPTH remains
+LMR_MIN_DEPTH = 3
+LMR_FULL_MOVES = 3
+LMR_REDUCTION = 1
 
-                    # Update the best move if this is better
-                    if eval_score > max_eval:
-                        max_eval = eval_score
-                        best_move = move
+# Multi-cut: at a null-window node, if MC_CUTS of the first MC_MOVES moves
+# fail high at a depth reduced by MC_REDUCTION, assume the node fails high
+MC_MIN_DEPTH = 4
+MC_MOVES = 6
+MC_CUTS = 3
+MC_REDUCTION = 2
 
-                    # Alpha-beta pruning
-                    alpha = max(alpha, eval_score)
-                    if beta <= alpha:
-                        break
-
-                return max_eval, best_move
-            else:
-                min_eval = float('inf')
-                opponent = 'r' if self.color == 'b' else 'b'
+# Quiet moves remembered per ply for causing a beta cutoff
+KILLERS_PER_PLY = 2
 
-                for move in self.get_valid_moves_with_pieces(state, opponent):
-                    p_clone, (tr, tc), captured = move
 
-                    # Skip invalid moves
-                    if not isinstance(p_clone, Piece):
-                        continue
-
-                    # Create a deep copy of the board to simulate the move
-                    next_state = deepcopy(state)
-
-                    # Get the copy of the piece from the copied board
-                    from_r, from_c = p_clone.row, p_clone.col
-                    piece_copy = next_state.board[from_r][from_c]
-
-                    # Make the move on the copied board
-                    next_state.make_move((piece_copy, (tr, tc), captured))
+class MinimaxAI:
+    def __init__(self, color, max_depth=1, lmr=False, multi_cut=False, weights=None,
+                 evaluator=None, cache=None, tt=None):  # Reduced default depth for better performance
+        self.color = color
+        self.max_depth = max_depth
+        self.weights = weights or EVAL_WEIGHTS
+        # Optional learned evaluator (e.g. nn_eval.MLPEvaluator) used instead
+        # of the handwritten evaluation; it scores positions for red
+        self.evaluator = evaluator
+        # Forward pruning options; both trade some accuracy for depth
+        self.lmr = lmr
+        self.multi_cut = multi_cut
+        # Optional cache.AnalysisCache of earlier search results
+        self.cache = cache
+        # Optional sharedtt.SharedTranspositionTable, or the name of one to
+        # attach to, shared with the other search processes
+        if isinstance(tt, str):
+            tt = SharedTranspositionTable.attach(tt)
+        self.tt = tt
+        # Killer moves, (from square, to square) pairs indexed by ply
+        self.killers = []
+        # Counters for the last search, reset by choose_move
+        self.stats = self._new_stats()
+        # Score of the last chosen move, from this AI's point of view
+        self.last_score = None
+
+    def _new_stats(self):
+        return {"nodes": 0, "repetitions": 0, "pvs_researches": 0,
+                "aspiration_researches": 0, "lmr_reductions": 0,
+                "lmr_researches": 0, "multi_cut_prunes": 0, "cache_hits": 0,
+                "tt_cutoffs": 0}
 
-                    # Evaluate the resulting position
-                    eval_score, _ = minimax(
-                        next_state, depth-1, alpha, beta, True)
+    def choose_move(self, game):
+        """Choose the best move using negamax with alpha-beta pruning.
+
+        The search deepens iteratively up to max_depth. Every iteration after
+        the first starts with an aspiration window around the previous score
+        and falls back to a full window if the result lands outside it.
+        """
+        self.stats = self._new_stats()
+        if self.cache is not None:
+            cached = self.cached_move(game)
+            if cached is not None:
+                return cached
 
-                    # Update the best move if this is better
-                    if eval_score < min_eval:
-                        min_eval = eval_score
-                        best_move = move
+        # Work on a clone of the board so we never touch the real one
+        board_copy = game.board.copy()
+
+        # Positions already played in the game plus the current search line.
+        # Reaching any of them again inside the tree is scored as a draw.
+        self._history = game.history.copy()
+        root_key = board_copy.hash_key(self.color)
+        if self._history.last() != root_key:
+            self._history.push(root_key)
+        self._draw_move_limit = game.draw_move_limit
+        self.killers = [[] for _ in range(self.max_depth + 1)]
+
+        score, best_move = None, None
+        for depth in range(1, self.max_depth + 1):
+            if score is None or score in (INF, -INF):
+                alpha, beta = -INF, INF
+            else:
+                alpha, beta = score - ASPIRATION_WINDOW, score + ASPIRATION_WINDOW
 
-                    # Alpha-beta pruning
-                    beta = min(beta, eval_score)
-                    if beta <= alpha:
-                        break
+            score, best_move = self.negamax(
+                board_copy, depth, alpha, beta, self.color, 0)
 
-                return min_eval, best_move
+            # Outside the window the score is only a bound, so search again
+            if (alpha != -INF and score <= alpha) or (beta != INF and score >= beta):
+                self.stats["aspiration_researches"] += 1
+                score, best_move = self.negamax(
+                    board_copy, depth, -INF, INF, self.color, 0)
 
-        # Run minimax on the board copy
-        _, best_move = minimax(board_copy, self.max_depth,
-                               float('-inf'), float('inf'), True)
+        self.last_score = score
+        if self.cache is not None:
+            cached_move = None
+            if best_move is not None:
+                piece, dest, jumped = best_move
+                cached_move = ((piece.row, piece.col), dest, jumped)
+            self.cache.put(root_key, self.max_depth, score, cached_move)
 
         # If no valid moves, return None
         if best_move is None:
@@ -105,32 +139,312 @@ class MinimaxAI:
         from_r, from_c = piece.row, piece.col
 
         # Find the corresponding real piece on the actual game board
-        real_piece = game.board.board[from_r][from_c]
+        real_piece = game.board.squares[square_index(from_r, from_c)]
 
         return real_piece, (to_r, to_c), jumped
 
+    def cached_move(self, game):
+        """Return the cached move for this position, or None on a miss.
+
+        A hit needs an entry searched at least max_depth deep whose move is
+        still playable on the board (guarding against hash collisions).
+        """
+        entry = self.cache.get(game.board.hash_key(self.color), self.max_depth)
+        if entry is None or entry[2] is None:
+            return None
+        _, score, ((from_r, from_c), dest, jumped) = entry
+        piece = game.board.squares[square_index(from_r, from_c)]
+        if piece == 0 or piece.color != self.color:
+            return None
+        if (dest, jumped) not in self.get_piece_moves(game.board, piece):
+            return None
+        self.stats["cache_hits"] += 1
+        self.last_score = score
+        return piece, dest, jumped
+
+    def negamax(self, state, depth, alpha, beta, color, ply, irreversible=False):
+        """Return (score, best move) for `color` to move in `state`.
+
+        Scores are from the point of view of the side to move, so a child's
+        score is negated on the way up.
+
+        Args:
+            state (Board): Position to search.
+            depth (int): Remaining depth.
+            alpha (float): Lower bound of the search window.
+            beta (float): Upper bound of the search window.
+            color (str): Side to move, "r" or "b".
+            ply (int): Distance from the root.
+            irreversible (bool): Whether the move into this node was a
+                capture or a man move.
+        """
+        self.stats["nodes"] += 1
+        # Base case: reached max depth or no pieces left
+        if depth == 0 or state.is_terminal():
+            score = self.evaluate(state)
+            return (score if color == self.color else -score), None
+
+        # Repetition and N-move draws cut the line off immediately (the
+        # root is already in the history)
+        history = self._history
+        key = state.hash_key(color)
+        if ply > 0 and (key in history or (
+                self._draw_move_limit and not irreversible and
+                history.plies_since_irreversible + 1 >= self._draw_move_limit)):
+            self.stats["repetitions"] += 1
+            return 0, None
+
+        # A deep enough stored result may settle this node without a search
+        tt_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(key)
+            if entry is not None:
+                tt_depth, flag, tt_score, tt_move = entry
+                if ply > 0 and tt_depth >= depth and (
+                        flag == EXACT or
+                        (flag == LOWER and tt_score >= beta) or
+                        (flag == UPPER and tt_score <= alpha)):
+                    self.stats["tt_cutoffs"] += 1
+                    return tt_score, None
+
+        if ply > 0:
+            history.push(key, irreversible)
+        try:
+            score, move = self.search_moves(state, depth, alpha, beta, color, ply, tt_move)
+        finally:
+            if ply > 0:
+                history.pop()
+
+        if self.tt is not None:
+            self.store_tt(key, depth, alpha, beta, score, move)
+        return score, move
+
+    def store_tt(self, key, depth, alpha, beta, score, move):
+        """Record a search result with the kind of bound it is."""
+        if score <= alpha:
+            flag = UPPER
+        elif score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if move is not None:
+            piece, (row, col), _ = move
+            move = (square_index(piece.row, piece.col), square_index(row, col))
+        self.tt.store(key, depth, flag, score, move)
+
+    def search_moves(self, state, depth, alpha, beta, color, ply, tt_move=None):
+        """Search every move of `color` with principal variation search.
+
+        The first move is searched with the full window. Later moves only
+        need to be proven no better than it, which a null window does
+        cheaply; a move that beats alpha is searched again with the full
+        window to get its exact score. Late quiet moves may first be tried
+        at reduced depth (self.lmr), and null-window nodes may be cut off
+        early by a shallow multi-cut probe (self.multi_cut). Moves come
+        from generate_moves, so a cutoff skips generating the rest.
+        """
+        opponent = 'r' if color == 'b' else 'b'
+        moves = self.generate_moves(state, color, ply, tt_move)
+
+        # Every child is a leaf: score them all in one evaluator call
+        if depth == 1 and self.evaluator is not None:
+            moves = list(moves)
+            if moves:
+                return self.search_frontier(state, moves, color)
+
+        if (self.multi_cut and ply > 0 and depth >= MC_MIN_DEPTH and
+                beta - alpha <= 2 * NULL_WINDOW):
+            first = list(islice(moves, MC_MOVES))
+            if self.multi_cut_fails_high(state, first, depth, beta, opponent, ply):
+                self.stats["multi_cut_prunes"] += 1
+                return beta, None
+            moves = chain(first, moves)
+
+        best_score, best_move = -INF, None
+
+        for index, move in enumerate(moves):
+            next_state, irreversible = self.make_child(state, move)
+
+            if index == 0 or alpha == -INF:
+                score = -self.negamax(next_state, depth - 1, -beta, -alpha,
+                                      opponent, ply + 1, irreversible)[0]
+            else:
+                score = None
+                if (self.lmr and ply > 0 and depth >= LMR_MIN_DEPTH and
+                        index >= LMR_FULL_MOVES and not move[2]):
+                    self.stats["lmr_reductions"] += 1
+                    score = -self.negamax(next_state, depth - 1 - LMR_REDUCTION,
+                                          -alpha - NULL_WINDOW, -alpha,
+                                          opponent, ply + 1, irreversible)[0]
+                    if score > alpha:
+                        # The reduced search was too optimistic to trust
+                        self.stats["lmr_researches"] += 1
+                        score = None
+
+                if score is None:
+                    score = -self.negamax(next_state, depth - 1,
+                                          -alpha - NULL_WINDOW, -alpha,
+                                          opponent, ply + 1, irreversible)[0]
+                if alpha < score < beta:
+                    self.stats["pvs_researches"] += 1
+                    score = -self.negamax(next_state, depth - 1, -beta, -alpha,
+                                          opponent, ply + 1, irreversible)[0]
+
+            # Update the best move if this is better
+            if score > best_score:
+                best_score, best_move = score, move
+
+            # Alpha-beta pruning
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if not move[2]:
+                    self.add_killer(move, ply)
+                break
+
+        return best_score, best_move
+
+    def generate_moves(self, state, color, ply, tt_move=None):
+        """Yield the moves of `color` lazily, most promising first.
+
+        Stages: the transposition table move, then every capture, then the
+        killer moves of this ply, then the remaining quiet moves. Each
+        stage is only generated if the search asks for more moves. The
+        moves are the same as get_valid_moves_with_pieces returns.
+        """
+        squares = state.squares
+        pieces = state.get_all_pieces(color)
+        tried = set()
+
+        if tt_move is not None:
+            (from_r, from_c), dest = PLAYABLE_SQUARES[tt_move[0]], PLAYABLE_SQUARES[tt_move[1]]
+            piece = squares[tt_move[0]]
+            if piece != 0 and piece.color == color:
+                for to, captured in self.get_piece_moves(state, piece):
+                    if to == dest:
+                        tried.add(((from_r, from_c), dest, frozenset(captured)))
+                        yield piece, dest, captured
+                        break
+
+        jumps = {}
+        for piece in pieces:
+            jumps[piece] = piece_jumps = []
+            self.check_jumps(state, piece, piece.row, piece.col, [], piece_jumps, set())
+            for dest, captured in piece_jumps:
+                if ((piece.row, piece.col), dest, frozenset(captured)) not in tried:
+                    yield piece, dest, captured
+
+        # A piece that can capture has no quiet moves
+        for start, dest in self.killers[ply] if ply < len(self.killers) else ():
+            piece = squares[square_index(*start)]
+            if (piece != 0 and piece.color == color and not jumps[piece] and
+                    (start, dest, frozenset()) not in tried and
+                    squares[square_index(*dest)] == 0 and
+                    (dest[0] - start[0], dest[1] - start[1]) in self.get_directions(piece)):
+                tried.add((start, dest, frozenset()))
+                yield piece, dest, []
+
+        for piece in pieces:
+            if jumps[piece]:
+                continue
+            start = square_index(piece.row, piece.col)
+            for direction in self.get_directions(piece):
+                target = NEIGHBOR[direction][start]
+                if (target >= 0 and squares[target] == 0 and
+                        ((piece.row, piece.col), PLAYABLE_SQUARES[target], frozenset())
+                        not in tried):
+                    yield piece, PLAYABLE_SQUARES[target], []
+
+    def add_killer(self, move, ply):
+        """Remember a quiet move that caused a beta cutoff at this ply."""
+        if ply >= len(self.killers):
+            return
+        piece, dest, _ = move
+        killer = ((piece.row, piece.col), dest)
+        killers = self.killers[ply]
+        if killer in killers:
+            killers.remove(killer)
+        killers.insert(0, killer)
+        del killers[KILLERS_PER_PLY:]
+
+    def search_frontier(self, state, moves, color):
+        """Score the leaf children of a depth-1 node with one batched call.
+
+        Equivalent to searching each child at depth 0, just without paying
+        for a separate evaluator call per leaf.
+        """
+        children = [self.make_child(state, move)[0] for move in moves]
+        self.stats["nodes"] += len(children)
+        values = self.evaluator.evaluate_batch(children)
+
+        best_index = 0
+        best_score = -INF
+        for index, value in enumerate(values):
+            score = float(value) if color == 'r' else -float(value)
+            if score > best_score:
+                best_score, best_index = score, index
+        return best_score, moves[best_index]
+
+    def multi_cut_fails_high(self, state, moves, depth, beta, opponent, ply):
+        """Return True if enough of the first moves fail high at reduced depth."""
+        cuts = 0
+        for index, move in enumerate(moves[:MC_MOVES]):
+            next_state, irreversible = self.make_child(state, move)
+            score = -self.negamax(next_state, depth - 1 - MC_REDUCTION,
+                                  -beta, -beta + NULL_WINDOW,
+                                  opponent, ply + 1, irreversible)[0]
+            if score >= beta:
+                cuts += 1
+                if cuts >= MC_CUTS:
+                    return True
+            # Stop once the remaining moves can no longer reach MC_CUTS
+            elif cuts + min(MC_MOVES, len(moves)) - index - 1 < MC_CUTS:
+                return False
+        return False
+
+    def make_child(self, state, move):
+        """Return the board after `move` and whether the move was irreversible."""
+        p_clone, (tr, tc), captured = move
+
+        # Copy the board to simulate the move
+        next_state = state.copy()
+
+        # Get the copy of the piece from the copied board
+        piece_copy = next_state.squares[square_index(p_clone.row, p_clone.col)]
+
+        # Make the move on the copied board
+        next_state.make_move((piece_copy, (tr, tc), captured))
+        return next_state, bool(captured) or not p_clone.king
+
     def get_valid_moves_with_pieces(self, board, color):
         """Get all valid moves for a given color, with the associated pieces."""
         moves = []
         for piece in board.get_all_pieces(color):
             # Get all valid moves for this piece
-            for (to_r, to_c), captured in self.get_piece_moves(board, piece).items():
+            for (to_r, to_c), captured in self.get_piece_moves(board, piece):
                 moves.append((piece, (to_r, to_c), captured))
         return moves
 
     def get_piece_moves(self, board, piece):
-        """Get all valid moves for a specific piece."""
-        moves = {}
+        """Get all valid moves for a specific piece.
 
-        # Check normal moves (non-jumps)
-        directions = self.get_directions(piece)
-        for dr, dc in directions:
-            row, col = piece.row + dr, piece.col + dc
-            if 0 <= row < 8 and 0 <= col < 8 and board.board[row][col] == 0:
-                moves[(row, col)] = []
+        Returns:
+            list: (destination, captured squares) pairs. As in Game, a piece
+            that can capture must capture, so it has no regular moves then.
+        """
+        moves = []
 
         # Check for jumps
         self.check_jumps(board, piece, piece.row, piece.col, [], moves, set())
+        if moves:
+            return moves
+
+        # Check normal moves (non-jumps)
+        directions = self.get_directions(piece)
+        start = square_index(piece.row, piece.col)
+        for direction in directions:
+            target = NEIGHBOR[direction][start]
+            if target >= 0 and board.squares[target] == 0:
+                moves.append((PLAYABLE_SQUARES[target], []))
 
         return moves
 
@@ -144,69 +458,85 @@ class MinimaxAI:
             return [(-1, -1), (-1, 1)]
 
     def check_jumps(self, board, piece, row, col, captured, moves, visited):
-        """Recursively check for jump moves."""
-        directions = self.get_directions(piece) if not captured else [
-            (-1, -1), (-1, 1), (1, -1), (1, 1)]
-
-        for dr, dc in directions:
-            mid_row, mid_col = row + dr, col + dc
-            jump_row, jump_col = row + 2*dr, col + 2*dc
+        """Recursively collect completed capture sequences into `moves`.
+
+        A sequence is only added once its piece cannot jump any further,
+        and sequences with the same landing square and the same set of
+        captured pieces (jumped in a different order) are added once.
+        """
+        found = False
+        directions = self.get_directions(piece) if not captured else ALL_DIRECTIONS
+        squares = board.squares
+        start = square_index(row, col)
+
+        for direction in directions:
+            jump = JUMP_TARGET[direction][start]
+            if jump < 0:
+                continue
+            mid_piece = squares[NEIGHBOR[direction][start]]
+            mid_square = PLAYABLE_SQUARES[NEIGHBOR[direction][start]]
+            jump_square = PLAYABLE_SQUARES[jump]
 
             # Check if jump is valid
-            if (0 <= mid_row < 8 and 0 <= mid_col < 8 and
-                0 <= jump_row < 8 and 0 <= jump_col < 8 and
-                board.board[mid_row][mid_col] != 0 and
-                board.board[mid_row][mid_col].color != piece.color and
-                board.board[jump_row][jump_col] == 0 and
-                (mid_row, mid_col) not in captured and
-                    (jump_row, jump_col) not in visited):
-
-                # Add this jump to moves
-                new_captured = captured + [(mid_row, mid_col)]
-                moves[(jump_row, jump_col)] = new_captured
-
-                # Check for additional jumps
-                visited_with_jump = visited.union({(jump_row, jump_col)})
-                self.check_jumps(board, piece, jump_row, jump_col,
+            if (mid_piece != 0 and mid_piece.color != piece.color and
+                    squares[jump] == 0 and
+                    mid_square not in captured and jump_square not in visited):
+
+                # Follow this jump until the sequence ends
+                found = True
+                new_captured = captured + [mid_square]
+                visited_with_jump = visited.union({jump_square})
+                self.check_jumps(board, piece, jump_square[0], jump_square[1],
                                  new_captured, moves, visited_with_jump)
 
+        if captured and not found:
+            captured_set = set(captured)
+            if not any(dest == (row, col) and set(done) == captured_set
+                       for dest, done in moves):
+                moves.append(((row, col), captured))
+
     def evaluate(self, state):
         """Evaluate the board position for the AI player."""
+        if self.evaluator is not None:
+            value = self.evaluator.evaluate(state)
+            return value if self.color == 'r' else -value
+
         # Count material
         # Kings are worth more than regular pieces
         material_value = 0
         position_value = 0
-        king_value = 1.5  
-
-        for row in range(8):
-            for col in range(8):
-                piece = state.board[row][col]
-                if piece != 0:
-                    # Material value
-                    piece_value = king_value if piece.king else 1
-                    if piece.color == self.color:
-                        material_value += piece_value
-
-                        # Positional bonuses
-                        if piece.color == 'b':  # Black moves up
-                            # Closer to promotion
-                            position_value += (7 - row) * 0.1
-                        else:  # Red moves down
-                            position_value += row * 0.1  # Closer to promotion
-
-                        # Edge bonus
-                        if col == 0 or col == 7:
-                            position_value += 0.2
+        man_value = self.weights["man"]
+        king_value = self.weights["king"]
+        advance = self.weights["advance"]
+        edge = self.weights["edge"]
+
+        for piece, (row, col) in zip(state.squares, PLAYABLE_SQUARES):
+            if piece != 0:
+                # Material value
+                piece_value = king_value if piece.king else man_value
+                if piece.color == self.color:
+                    material_value += piece_value
+
+                    # Positional bonuses
+                    if piece.color == 'b':  # Black moves up
+                        # Closer to promotion
+                        position_value += (7 - row) * advance
+                    else:  # Red moves down
+                        position_value += row * advance  # Closer to promotion
+
+                    # Edge bonus
+                    if col == 0 or col == 7:
+                        position_value += edge
+                else:
+                    material_value -= piece_value
+
+                    # Same positional considerations for opponent
+                    if piece.color == 'b':
+                        position_value -= (7 - row) * advance
                     else:
-                        material_value -= piece_value
-
-                        # Same positional considerations for opponent
-                        if piece.color == 'b':
-                            position_value -= (7 - row) * 0.1
-                        else:
-                            position_value -= row * 0.1
+                        position_value -= row * advance
 
-                        if col == 0 or col == 7:
-                            position_value -= 0.2
+                    if col == 0 or col == 7:
+                        position_value -= edge
 
         return material_value + position_value
@@ -0,0 +1,296 @@
+# Bulk position analysis: reads positions from a file or stdin, searches
+# each one with MinimaxAI on a pool of worker processes and prints one JSON
+# line per position, in input order.
+#
+# Input lines are either a single position, "<32 squares> [r|b]" as written
+# by Board.to_squares (side to move defaults to red) or a FEN string as
+# written by Board.to_fen, or PDN games: optional [Tag "value"] header lines
+# followed by movetext such as "1. 9-13 22-18 2. 13x22 ..." ending in a
+# result (1-0, 0-1, 1/2-1/2, *). A [FEN "..."] header sets the game's
+# starting position. Every position reached in a PDN game is analyzed. Squares are numbered
+# 1-32 in the order of board.PLAYABLE_SQUARES, so red starts on 1-12.
+#
+# python analyze.py positions.txt --depth 6 --processes 8 > analysis.jsonl
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool, util
+
+from AI import MinimaxAI
+from board import PLAYABLE_SQUARES, Board
+from cache import AnalysisCache
+from sharedtt import SharedTranspositionTable
+from game import Game
+
+RESULTS = {"1-0", "0-1", "1/2-1/2", "*"}
+_MOVE_NUMBER = re.compile(r"^\d+\.+$")
+_POSITION = re.compile(r"^([.rbRB]{32})(?:\s+([rb]))?$")
+_FEN = re.compile(r"^[RB]:")
+_FEN_HEADER = re.compile(r'^\[FEN\s+"([^"]*)"\]$')
+_SQUARE_NUMBER = {square: i + 1 for i, square in enumerate(PLAYABLE_SQUARES)}
+
+
+def square_number(row, col):
+    """Return the 1-32 PDN number of a playable square."""
+    return _SQUARE_NUMBER[(row, col)]
+
+
+def format_move(start, dest, captured):
+    """Write a move in PDN notation, e.g. "9-13" or "13x22x31".
+
+    The intermediate landing squares of a capture sequence are rebuilt from
+    the captured pieces: each jump lands just beyond the piece it takes.
+    """
+    if not captured:
+        return f"{square_number(*start)}-{square_number(*dest)}"
+    squares = [start]
+    for row, col in captured:
+        from_row, from_col = squares[-1]
+        squares.append((2 * row - from_row, 2 * col - from_col))
+    return "x".join(str(square_number(*square)) for square in squares)
+
+
+def parse_move(token):
+    """Return the (row, col) squares of a PDN move like "9-13" or "9x18x27"."""
+    try:
+        numbers = [int(n) for n in re.split(r"[-x]", token)]
+    except ValueError:
+        raise ValueError(f"Invalid PDN move: {token!r}")
+    if len(numbers) < 2 or not all(1 <= n <= 32 for n in numbers):
+        raise ValueError(f"Invalid PDN move: {token!r}")
+    return [PLAYABLE_SQUARES[n - 1] for n in numbers]
+
+
+def apply_pdn_move(game, token):
+    """Play a PDN move on `game` and pass the turn."""
+    squares = parse_move(token)
+    (row, col), (to_row, to_col) = squares[0], squares[-1]
+    piece = game.board.board[row][col]
+    if piece == 0 or piece.color != game.turn:
+        raise ValueError(f"No {game.turn} piece on square {square_number(row, col)}")
+    game.move(piece, to_row, to_col)
+    game.switch_turn()
+
+
+def read_positions(lines):
+    """Yield (info, squares, turn) for every position in the input.
+
+    `info` is a dict identifying the position ({"line": n} for a position
+    line, {"game": g, "ply": p} for a PDN game). Lines that cannot be read
+    give an info dict with an "error" entry and squares set to None.
+    """
+    game_number = 0
+    tokens = []
+    start_line = None
+    start_fen = None
+
+    def play_game():
+        info = {"game": game_number, "line": start_line}
+        try:
+            game = Game.from_fen(start_fen) if start_fen else Game()
+        except ValueError as e:
+            yield dict(info, ply=0, error=str(e)), None, None
+            return
+        for ply, token in enumerate(tokens):
+            yield dict(info, ply=ply), game.board.to_squares(), game.turn
+            try:
+                apply_pdn_move(game, token)
+            except ValueError as e:
+                yield dict(info, ply=ply + 1, error=str(e)), None, None
+                return
+        yield dict(info, ply=len(tokens)), game.board.to_squares(), game.turn
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        position = _POSITION.match(line)
+
+        is_fen = _FEN.match(line)
+
+        # A blank line, a header or a position ends the game being read
+        if not line or line.startswith("[") or position or is_fen:
+            if tokens:
+                yield from play_game()
+                tokens = []
+                start_fen = None
+            if position:
+                yield {"line": line_number}, position.group(1), position.group(2) or "r"
+            elif is_fen:
+                try:
+                    board, turn = Board.from_fen(line)
+                    yield {"line": line_number}, board.to_squares(), turn
+                except ValueError as e:
+                    yield {"line": line_number, "error": str(e)}, None, None
+            elif _FEN_HEADER.match(line):
+                start_fen = _FEN_HEADER.match(line).group(1)
+            continue
+
+        for token in line.split():
+            if _MOVE_NUMBER.match(token):
+                continue
+            if not tokens:
+                game_number += 1
+                start_line = line_number
+            if token in RESULTS:
+                if tokens:
+                    yield from play_game()
+                tokens = []
+                start_fen = None
+                continue
+            tokens.append(token)
+
+    if tokens:
+        yield from play_game()
+
+
+# The AnalysisCache and transposition table of this process, opened on
+# first use
+_caches = {}
+_tables = {}
+
+
+def _open_cache(path):
+    if path not in _caches:
+        _caches[path] = AnalysisCache(path)
+        # Pool workers skip atexit; a finalizer still commits pending writes
+        util.Finalize(None, _caches[path].close, exitpriority=10)
+    return _caches[path]
+
+
+def _attach_tt(name):
+    if name not in _tables:
+        _tables[name] = SharedTranspositionTable.attach(name)
+    return _tables[name]
+
+
+def analyze_position(task):
+    """Search one position. Runs in the worker processes.
+
+    Returns:
+        dict: Best move in PDN notation (None if the side to move has no
+        moves), score from the side to move's point of view, search depth,
+        node count and time in seconds. A forced result the search can see
+        is reported as "result": "win"/"loss" with a null score.
+    """
+    squares, turn, depth, options = task
+    options = dict(options)
+    if options.get("cache"):
+        options["cache"] = _open_cache(options["cache"])
+    if options.get("tt"):
+        options["tt"] = _attach_tt(options["tt"])
+    game = Game(Board.from_squares(squares), turn)
+    ai = MinimaxAI(turn, depth, **options)
+
+    start = time.perf_counter()
+    move = ai.choose_move(game)
+    elapsed = time.perf_counter() - start
+
+    result = {"move": None, "score": ai.last_score, "depth": depth,
+              "nodes": ai.stats["nodes"], "time": round(elapsed, 4)}
+    if ai.stats["cache_hits"]:
+        result["cached"] = True
+    if move is not None:
+        piece, dest, captured = move
+        result["move"] = format_move((piece.row, piece.col), dest, captured)
+    if result["score"] is not None and not math.isfinite(result["score"]):
+        result["result"] = "win" if result["score"] > 0 else "loss"
+        result["score"] = None
+    return result
+
+
+def analyze_stream(positions, depth=4, processes=None, window=None, options=None):
+    """Analyze a stream of positions and yield (info, result) in input order.
+
+    At most `window` positions are queued or being searched at a time, so
+    memory stays flat however long the input is. Pool.imap would read the
+    whole input up front, which is why the results are tracked by hand.
+
+    Args:
+        positions: Iterable of (info, squares, turn) as from read_positions.
+        processes (int): Worker processes; 0 searches in this process.
+        window (int): Maximum positions in flight (default 4 per worker).
+        options (dict): Extra MinimaxAI keyword arguments (lmr, multi_cut),
+            where "cache" is the path of an AnalysisCache file and "tt" the
+            name of a SharedTranspositionTable.
+    """
+    options = options or {}
+    if processes == 0:
+        for info, squares, turn in positions:
+            if squares is None:
+                yield info, {}
+            else:
+                yield info, analyze_position((squares, turn, depth, options))
+        return
+
+    processes = processes or os.cpu_count() or 1
+    window = window or 4 * processes
+    pool = Pool(processes)
+    pending = deque()
+    try:
+        for info, squares, turn in positions:
+            if len(pending) >= window:
+                done_info, result = pending.popleft()
+                yield done_info, result.get() if result is not None else {}
+            result = None
+            if squares is not None:
+                result = pool.apply_async(analyze_position, ((squares, turn, depth, options),))
+            pending.append((info, result))
+
+        while pending:
+            done_info, result = pending.popleft()
+            yield done_info, result.get() if result is not None else {}
+    finally:
+        # Let finished workers exit normally so their caches are flushed
+        if pending:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze checkers positions and print JSON lines.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file of positions or PDN games (default: stdin)")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU, 0: no pool)")
+    parser.add_argument("--window", type=int, default=None,
+                        help="maximum positions in flight")
+    parser.add_argument("--lmr", action="store_true")
+    parser.add_argument("--multi-cut", action="store_true")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="SQLite file of earlier results to reuse and extend")
+    parser.add_argument("--tt-size", type=int, default=1 << 20,
+                        help="entries in the transposition table shared by the workers (0: none)")
+    args = parser.parse_args()
+
+    options = {"lmr": args.lmr, "multi_cut": args.multi_cut, "cache": args.cache}
+    tt = SharedTranspositionTable(args.tt_size) if args.tt_size else None
+    if tt is not None:
+        options["tt"] = tt.name
+    f = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        results = analyze_stream(read_positions(f), args.depth, args.processes,
+                                 args.window, options)
+        for info, result in results:
+            print(json.dumps(dict(info, **result)), flush=True)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+        for cache in _caches.values():
+            cache.close()
+        for table in _tables.values():
+            table.close()
+        if tt is not None:
+            tt.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# Vectorized random-playout simulator.
+#
+# Thousands of games are held as NumPy arrays of 32-bit bitboards (red
+# pieces, black pieces, kings), one bit per playable square in the order of
+# board.PLAYABLE_SQUARES. All games advance in lockstep: every ply, the
+# legal moves of every game are generated with shift-and-mask operations,
+# one move per game is sampled uniformly and applied, and finished games
+# are frozen. The rules follow Game: a piece that can capture must capture,
+# a capturing piece keeps jumping (in any direction) while it can, and men
+# are crowned when the move ends on the far row.
+
+import numpy as np
+
+from board import PLAYABLE_SQUARES, Board
+
+# Directions as (row step, col step): down-left, down-right, up-left, up-right
+DIRECTIONS = ((1, -1), (1, 1), (-1, -1), (-1, 1))
+RED_DIRECTIONS = (0, 1)  # Red men move down
+BLACK_DIRECTIONS = (2, 3)  # Black men move up
+
+_INDEX = {square: i for i, square in enumerate(PLAYABLE_SQUARES)}
+
+
+def _neighbor(i, dr, dc, distance):
+    row, col = PLAYABLE_SQUARES[i]
+    return _INDEX.get((row + distance * dr, col + distance * dc), -1)
+
+
+# STEP[d, i], JUMP[d, i]: square reached from i by one or two steps in
+# direction d, or -1 off the board
+STEP = np.array([[_neighbor(i, dr, dc, 1) for i in range(32)] for dr, dc in DIRECTIONS])
+JUMP = np.array([[_neighbor(i, dr, dc, 2) for i in range(32)] for dr, dc in DIRECTIONS])
+
+# A step changes the square index by a different amount on even and odd
+# rows, so each direction is a pair of masked shifts. A jump always moves
+# by the same amount (+-7 or +-9).
+_STEP_SHIFTS = []
+_JUMP_SHIFTS = []
+for _d in range(4):
+    _shifts = {}
+    for _i in range(32):
+        if STEP[_d, _i] >= 0:
+            _offset = int(STEP[_d, _i]) - _i
+            _shifts[_offset] = _shifts.get(_offset, 0) | (1 << _i)
+    _STEP_SHIFTS.append([(offset, np.uint32(mask)) for offset, mask in _shifts.items()])
+
+    _sources = [_i for _i in range(32) if JUMP[_d, _i] >= 0]
+    _JUMP_SHIFTS.append((int(JUMP[_d, _sources[0]]) - _sources[0],
+                         np.uint32(sum(1 << _i for _i in _sources))))
+
+RED_KING_ROW = np.uint32(sum(1 << i for i, (row, _) in enumerate(PLAYABLE_SQUARES) if row == 7))
+BLACK_KING_ROW = np.uint32(sum(1 << i for i, (row, _) in enumerate(PLAYABLE_SQUARES) if row == 0))
+_BITS = np.left_shift(np.uint32(1), np.arange(32, dtype=np.uint32))
+
+
+def _shift(bb, offset):
+    return np.left_shift(bb, offset) if offset >= 0 else np.right_shift(bb, -offset)
+
+
+def step(bb, d):
+    """Move every bit of `bb` one square in direction d (dropping off-board)."""
+    out = np.zeros_like(bb)
+    for offset, mask in _STEP_SHIFTS[d]:
+        out |= _shift(bb & mask, offset)
+    return out
+
+
+def step_back(bb, d):
+    """Inverse of step: squares from which a step in direction d lands in `bb`."""
+    out = np.zeros_like(bb)
+    for offset, mask in _STEP_SHIFTS[d]:
+        out |= _shift(bb, -offset) & mask
+    return out
+
+
+def jump_back(bb, d):
+    """Squares from which a jump in direction d lands in `bb`."""
+    offset, mask = _JUMP_SHIFTS[d]
+    return _shift(bb, -offset) & mask
+
+
+def unpack(bb):
+    """Return an (N, 32) bool array of the bits of an (N,) bitboard array."""
+    return (bb[:, None] & _BITS) != 0
+
+
+def to_squares(red, black, kings):
+    """Return the (N, 32) uint8 encoding (as Board.to_squares) of bitboards."""
+    r, b, k = unpack(red), unpack(black), unpack(kings)
+    out = np.full(r.shape, ord("."), dtype=np.uint8)
+    out[r] = ord("r")
+    out[b] = ord("b")
+    out[r & k] = ord("R")
+    out[b & k] = ord("B")
+    return out
+
+
+def from_board(board):
+    """Return the (red, black, kings) bitboards of a Board."""
+    return board.to_masks()
+
+
+def to_board(red, black, kings):
+    """Build a Board from one game's bitboards."""
+    return Board.from_masks(int(red), int(black), int(kings))
+
+
+class BatchSimulator:
+    """Plays many random games at once.
+
+    Attributes:
+        red, black, kings: (N,) uint32 bitboards of every game.
+        turn (str): Side to move in every unfinished game.
+        done: (N,) bool, games that have ended.
+        result: (N,) int8, +1 red won, -1 black won, 0 draw or unfinished.
+        plies: (N,) number of plies each game lasted.
+    """
+
+    def __init__(self, n_games, seed=None, board=None, turn="r"):
+        red, black, kings = from_board(board or Board())
+        self.red = np.full(n_games, red, dtype=np.uint32)
+        self.black = np.full(n_games, black, dtype=np.uint32)
+        self.kings = np.full(n_games, kings, dtype=np.uint32)
+        self.turn = turn
+        self.rng = np.random.default_rng(seed)
+        self.done = np.zeros(n_games, dtype=bool)
+        self.result = np.zeros(n_games, dtype=np.int8)
+        self.plies = np.zeros(n_games, dtype=np.int32)
+
+    def legal_moves(self):
+        """Return (jumps, steps): (N, 4, 32) bool arrays of movable pieces.
+
+        jumps[g, d, i] means the piece on square i of game g can capture
+        in direction d; steps likewise for simple moves. As in
+        Game.get_valid_moves, a piece that can capture has no simple moves.
+        """
+        own, opp = (self.red, self.black) if self.turn == "r" else (self.black, self.red)
+        empty = ~(self.red | self.black)
+        men_dirs = RED_DIRECTIONS if self.turn == "r" else BLACK_DIRECTIONS
+
+        jumps = np.empty((len(own), 4, 32), dtype=bool)
+        steps = np.empty((len(own), 4, 32), dtype=bool)
+        for d in range(4):
+            movers = own if d in men_dirs else own & self.kings
+            steps[:, d] = unpack(movers & step_back(empty, d))
+            jumps[:, d] = unpack(movers & step_back(opp, d) & jump_back(empty, d))
+
+        steps &= ~jumps.any(axis=1)[:, None, :]
+        return jumps, steps
+
+    def step(self):
+        """Play one ply in every unfinished game. Return False once all are done."""
+        active = ~self.done
+        if not active.any():
+            return False
+
+        jumps, steps = self.legal_moves()
+        candidates = jumps | steps
+        candidates[self.done] = False
+        flat = candidates.reshape(len(candidates), 128)
+
+        # Games where the side to move is stuck are lost for that side
+        stuck = active & ~flat.any(axis=1)
+        self.done |= stuck
+        self.result[stuck] = -1 if self.turn == "r" else 1
+        moving = np.flatnonzero(active & ~stuck)
+
+        if len(moving):
+            # Sample one candidate uniformly per game
+            keys = np.where(flat[moving], self.rng.random((len(moving), 128)), -1.0)
+            choice = keys.argmax(axis=1)
+            d, src = choice // 32, choice % 32
+            is_jump = jumps.reshape(len(jumps), 128)[moving, choice]
+            self._apply(moving, d, src, is_jump)
+            self.plies[moving] += 1
+
+        self.turn = "b" if self.turn == "r" else "r"
+        return bool((~self.done).any())
+
+    def _apply(self, games, d, src, is_jump):
+        own, opp = (self.red, self.black) if self.turn == "r" else (self.black, self.red)
+        src_bit = _BITS[src]
+        was_king = (self.kings[games] & src_bit) != 0
+
+        # Simple moves
+        dest = np.where(is_jump, JUMP[d, src], STEP[d, src])
+        self._move_piece(own, games, src_bit, _BITS[dest], was_king)
+
+        # Captures, continued with the same piece while it can keep jumping
+        jumping = games[is_jump]
+        pos = dest[is_jump]
+        mid = STEP[d[is_jump], src[is_jump]]
+        visited = src_bit[is_jump] | _BITS[pos]
+        king = was_king[is_jump]
+        while len(jumping):
+            opp[jumping] &= ~_BITS[mid]
+            self.kings[jumping] &= ~_BITS[mid]
+
+            # Continuation jumps from pos in every direction
+            landing = JUMP[:, pos].T  # (M, 4)
+            middle = STEP[:, pos].T
+            empty = ~(self.red[jumping] | self.black[jumping])
+            can = (landing >= 0) & \
+                ((opp[jumping][:, None] & _BITS[middle]) != 0) & \
+                ((empty[:, None] & _BITS[landing]) != 0) & \
+                ((visited[:, None] & _BITS[landing]) == 0)
+            more = can.any(axis=1)
+            keys = np.where(can[more], self.rng.random((int(more.sum()), 4)), -1.0)
+            d_next = keys.argmax(axis=1)
+
+            jumping, pos, visited, king = jumping[more], pos[more], visited[more], king[more]
+            new_pos = landing[more, d_next]
+            mid = middle[more, d_next]
+            self._move_piece(own, jumping, _BITS[pos], _BITS[new_pos], king)
+            visited |= _BITS[new_pos]
+            pos = new_pos
+
+        # Crown men that ended the move on the far row
+        king_row = RED_KING_ROW if self.turn == "r" else BLACK_KING_ROW
+        self.kings[games] |= own[games] & king_row
+
+    def _move_piece(self, own, games, from_bits, to_bits, king):
+        own[games] = (own[games] & ~from_bits) | to_bits
+        self.kings[games] = np.where(king, (self.kings[games] & ~from_bits) | to_bits,
+                                     self.kings[games])
+
+    def run(self, max_plies=200):
+        """Play every game to the end, yielding each position on the way.
+
+        Yields:
+            tuple: (turn, red, black, kings, active) after copying the
+            arrays, where active marks the games still being played in
+            that position. Games still running after max_plies are left
+            as draws.
+        """
+        for _ in range(max_plies):
+            active = ~self.done
+            if not active.any():
+                return
+            yield self.turn, self.red.copy(), self.black.copy(), self.kings.copy(), active
+            self.step()
+
+    def write_corpus(self, f, max_plies=200):
+        """Play every game out and write each position with its game's
+        result to the text file `f`, in the format tuning.py reads."""
+        snapshots = list(self.run(max_plies))
+        outcome = np.array([b"0.0", b"0.5", b"1.0"])[self.result.astype(np.int64) + 1]
+        for _, red, black, kings, active in snapshots:
+            squares = to_squares(red[active], black[active], kings[active])
+            lines = np.concatenate(
+                [squares, np.full((len(squares), 1), ord(" "), dtype=np.uint8),
+                 outcome[active].view(np.uint8).reshape(-1, 3),
+                 np.full((len(squares), 1), ord("\n"), dtype=np.uint8)], axis=1)
+            f.write(lines.tobytes())
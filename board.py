@@ -1,6 +1,57 @@
 # This module defines the Board and Piece classes for a checkers game.
 
+import random
+import struct
+
+# Zobrist keys: one random 64-bit number per (square, piece kind), plus one
+# for "black to move". XOR-ing the keys of every occupied square gives a
+# position hash that is cheap to compare and store.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_PIECES = {
+    kind: [_zobrist_rng.getrandbits(64) for _ in range(64)]
+    for kind in (("r", False), ("r", True), ("b", False), ("b", True))
+}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+# The 32 dark squares pieces can stand on, in row-major order. Index i in
+# this list is square i of the compact 32-square board encoding.
+PLAYABLE_SQUARES = [(row, col) for row in range(8) for col in range(8)
+                    if (row + col) % 2 == 1]
+
+
+
+def square_index(row, col):
+    """Return the index of a playable square in PLAYABLE_SQUARES."""
+    return row * 4 + col // 2
+
+
+# All four diagonal directions, and for each one and each playable square
+# the index of the square one step (NEIGHBOR) or two steps (JUMP_TARGET)
+# away, or -1 off the board
+ALL_DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+NEIGHBOR = {}
+JUMP_TARGET = {}
+for _dr, _dc in ALL_DIRECTIONS:
+    NEIGHBOR[(_dr, _dc)] = [square_index(r + _dr, c + _dc)
+                            if 0 <= r + _dr < 8 and 0 <= c + _dc < 8 else -1
+                            for r, c in PLAYABLE_SQUARES]
+    JUMP_TARGET[(_dr, _dc)] = [square_index(r + 2 * _dr, c + 2 * _dc)
+                               if 0 <= r + 2 * _dr < 8 and 0 <= c + 2 * _dc < 8 else -1
+                               for r, c in PLAYABLE_SQUARES]
+
+# ZOBRIST_PIECES re-indexed by playable square
+_ZOBRIST_SQUARES = {kind: [keys[row * 8 + col] for row, col in PLAYABLE_SQUARES]
+                    for kind, keys in ZOBRIST_PIECES.items()}
+
+# Packed position: red, black and king bitmasks over PLAYABLE_SQUARES
+# followed by the side to move (0 red, 1 black), 13 bytes in all
+_PACKED = struct.Struct("<IIIB")
+PACKED_SIZE = _PACKED.size
+
+
 class Piece:
+    __slots__ = ("row", "col", "color", "king")
+
     def __init__(self, row, col, color, king=False):
         self.row = row
         self.col = col
@@ -10,29 +61,117 @@ class Piece:
     def make_king(self):
         self.king = True
 
+    def copy(self):
+        return Piece(self.row, self.col, self.color, self.king)
+
     def __repr__(self):
         return self.color.upper() if self.king else self.color
 
 
+class BoardRow:
+    """One row of a BoardView. Light squares always read as 0."""
+    __slots__ = ("squares", "row")
+
+    def __init__(self, squares, row):
+        self.squares = squares
+        self.row = row
+
+    def __getitem__(self, col):
+        if not 0 <= col < 8:
+            raise IndexError(f"Column {col} is off the board")
+        if (self.row + col) % 2 == 0:
+            return 0
+        return self.squares[self.row * 4 + col // 2]
+
+    def __setitem__(self, col, value):
+        if not 0 <= col < 8:
+            raise IndexError(f"Column {col} is off the board")
+        if (self.row + col) % 2 == 0:
+            if value != 0:
+                raise ValueError(f"({self.row}, {col}) is not a playable square")
+            return
+        self.squares[self.row * 4 + col // 2] = value
+
+    def __iter__(self):
+        return (self[col] for col in range(8))
+
+    def __len__(self):
+        return 8
+
+
+class BoardView:
+    """8x8 view of a Board's 32 squares, so board.board[row][col] keeps working."""
+    __slots__ = ("squares",)
+
+    def __init__(self, squares):
+        self.squares = squares
+
+    def __getitem__(self, row):
+        if not 0 <= row < 8:
+            raise IndexError(f"Row {row} is off the board")
+        return BoardRow(self.squares, row)
+
+    def __iter__(self):
+        return (BoardRow(self.squares, row) for row in range(8))
+
+    def __len__(self):
+        return 8
+
+
 class Board:
     def __init__(self):
-        self.board = []
+        # One entry per playable square (see PLAYABLE_SQUARES): a Piece or 0
+        self.squares = [0] * 32
         self.create_board()
 
-    def create_board(self):
-        """Initialize the checkers board with pieces in starting positions."""
+    @property
+    def board(self):
+        """The squares as an 8x8 grid: board.board[row][col]."""
+        return BoardView(self.squares)
+
+    @board.setter
+    def board(self, rows):
+        squares = [0] * 32
         for row in range(8):
-            self.board.append([])
             for col in range(8):
-                if (row + col) % 2 == 1:  # Only use dark squares
-                    if row < 3:
-                        self.board[row].append(Piece(row, col, "r"))
-                    elif row > 4:
-                        self.board[row].append(Piece(row, col, "b"))
-                    else:
-                        self.board[row].append(0)
-                else:
-                    self.board[row].append(0)
+                piece = rows[row][col]
+                if (row + col) % 2 == 1:
+                    squares[row * 4 + col // 2] = piece
+                elif piece != 0:
+                    raise ValueError(f"({row}, {col}) is not a playable square")
+        self.squares = squares
+
+    def create_board(self):
+        """Initialize the checkers board with pieces in starting positions."""
+        for i, (row, col) in enumerate(PLAYABLE_SQUARES):
+            if row < 3:
+                self.squares[i] = Piece(row, col, "r")
+            elif row > 4:
+                self.squares[i] = Piece(row, col, "b")
+            else:
+                self.squares[i] = 0
+
+    def copy(self):
+        """Return an independent copy of the board and its pieces."""
+        board = Board.__new__(Board)
+        board.squares = [piece if piece == 0 else
+                         Piece(piece.row, piece.col, piece.color, piece.king)
+                         for piece in self.squares]
+        return board
+
+    def __copy__(self):
+        board = Board.__new__(Board)
+        board.squares = list(self.squares)
+        return board
+
+    def __deepcopy__(self, memo):
+        board = self.copy()
+        memo[id(self)] = board
+        # Other references to the same pieces map to the copies
+        for old, new in zip(self.squares, board.squares):
+            if old != 0:
+                memo[id(old)] = new
+        return board
 
     def print_board(self):
         """Print a text representation of the board."""
@@ -45,53 +184,55 @@ class Board:
         if not isinstance(piece, Piece):
             raise ValueError(f"Expected a Piece object, got {type(piece)}")
 
-        self.board[piece.row][piece.col] = 0
+        self.squares[square_index(piece.row, piece.col)] = 0
         piece.row, piece.col = row, col
-        self.board[row][col] = piece
+        self.squares[square_index(row, col)] = piece
 
     def remove_piece(self, row, col):
         """Remove a piece from the board (used for captures)."""
-        self.board[row][col] = 0
+        self.squares[square_index(row, col)] = 0
 
     def get_all_pieces(self, color):
         """Return a list of all pieces of the given color."""
-        pieces = []
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece != 0 and piece.color == color:
-                    pieces.append(piece)
-        return pieces
+        return [piece for piece in self.squares if piece != 0 and piece.color == color]
 
     def count_pieces(self):
         """Return number of pieces remaining for both players."""
         red = black = 0
-        for row in self.board:
-            for piece in row:
-                if piece != 0:
-                    if piece.color == "r":
-                        red += 1
-                    else:
-                        black += 1
+        for piece in self.squares:
+            if piece != 0:
+                if piece.color == "r":
+                    red += 1
+                else:
+                    black += 1
         return red, black
 
     def get_all_moves(self, color):
-        """Generate all valid moves for the given color."""
+        """Generate all valid moves for the given color.
+
+        A piece that can capture must capture (as in Game), and captures
+        are whole sequences: see _check_jumps.
+        """
         moves = []
         for piece in self.get_all_pieces(color):
             if not isinstance(piece, Piece):
                 continue
 
+            # Check for jump moves
+            jumps = []
+            self._check_jumps(piece, piece.row, piece.col, [], jumps, set())
+            if jumps:
+                moves.extend(jumps)
+                continue
+
             # Check for normal moves (non-jumps)
             directions = self._get_directions(piece)
 
-            for dr, dc in directions:
-                row, col = piece.row + dr, piece.col + dc
-                if 0 <= row < 8 and 0 <= col < 8 and self.board[row][col] == 0:
-                    moves.append((piece, (row, col), []))
-
-            # Check for jump moves
-            self._check_jumps(piece, piece.row, piece.col, [], moves, set())
+            start = square_index(piece.row, piece.col)
+            for direction in directions:
+                target = NEIGHBOR[direction][start]
+                if target >= 0 and self.squares[target] == 0:
+                    moves.append((piece, PLAYABLE_SQUARES[target], []))
 
         return moves
 
@@ -106,6 +247,11 @@ class Board:
 
     def _check_jumps(self, piece, row, col, captured, moves, visited):
         """ Recursively check for valid jump moves.
+
+        Only completed sequences (where the piece cannot jump again) are
+        added, and a sequence capturing the same pieces as one already in
+        `moves` and landing on the same square is skipped.
+
         Args:
             piece (Piece): The piece to check for jumps.
             row (int): Current row of the piece.
@@ -118,31 +264,37 @@ class Board:
         # Kings can jump in any direction
         # Regular pieces can only jump in their forward direction initially
         # After first jump, all pieces can jump in any direction
-        directions = self._get_directions(piece) if not captured else [
-            (-1, -1), (-1, 1), (1, -1), (1, 1)]
+        directions = self._get_directions(piece) if not captured else ALL_DIRECTIONS
+        squares = self.squares
+        start = square_index(row, col)
+        found = False
 
-        for dr, dc in directions:
-            mid_row, mid_col = row + dr, col + dc
-            jump_row, jump_col = row + 2*dr, col + 2*dc
+        for direction in directions:
+            jump = JUMP_TARGET[direction][start]
+            if jump < 0:
+                continue
+            mid_piece = squares[NEIGHBOR[direction][start]]
+            mid_square = PLAYABLE_SQUARES[NEIGHBOR[direction][start]]
+            jump_square = PLAYABLE_SQUARES[jump]
 
             # Check if jump is valid
-            if (0 <= mid_row < 8 and 0 <= mid_col < 8 and
-                0 <= jump_row < 8 and 0 <= jump_col < 8 and
-                self.board[mid_row][mid_col] != 0 and
-                self.board[mid_row][mid_col].color != piece.color and
-                self.board[jump_row][jump_col] == 0 and
-                (mid_row, mid_col) not in captured and
-                    (jump_row, jump_col) not in visited):
-
-                # Add this jump to moves
-                new_captured = captured + [(mid_row, mid_col)]
-                moves.append((piece, (jump_row, jump_col), new_captured))
-
-                # Check for additional jumps
-                visited_with_jump = visited.union({(jump_row, jump_col)})
-                self._check_jumps(piece, jump_row, jump_col,
+            if (mid_piece != 0 and mid_piece.color != piece.color and
+                    squares[jump] == 0 and
+                    mid_square not in captured and jump_square not in visited):
+
+                # Follow this jump until the sequence ends
+                found = True
+                new_captured = captured + [mid_square]
+                visited_with_jump = visited.union({jump_square})
+                self._check_jumps(piece, jump_square[0], jump_square[1],
                                   new_captured, moves, visited_with_jump)
 
+        if captured and not found:
+            captured_set = set(captured)
+            if not any(dest == (row, col) and set(done) == captured_set
+                       for _, dest, done in moves):
+                moves.append((piece, (row, col), captured))
+
     def make_move(self, move):
         """Simulate a move on the board.
         Args:
@@ -155,18 +307,132 @@ class Board:
                 f"Expected a Piece, got {type(piece)} with value {piece}")
 
         # Move the piece to the new position
-        self.board[piece.row][piece.col] = 0
+        squares = self.squares
+        squares[square_index(piece.row, piece.col)] = 0
         piece.row, piece.col = row, col
-        self.board[row][col] = piece
+        squares[square_index(row, col)] = piece
 
         # Remove any captured pieces
         for r, c in captured:
-            self.board[r][c] = 0
+            squares[square_index(r, c)] = 0
 
         # Promote to king if reaching end row
         if (piece.color == "r" and row == 7) or (piece.color == "b" and row == 0):
             piece.make_king()
 
+    def hash_key(self, turn="r"):
+        """Return a 64-bit Zobrist hash of this position with `turn` to move."""
+        key = ZOBRIST_BLACK_TO_MOVE if turn == "b" else 0
+        for i, piece in enumerate(self.squares):
+            if piece != 0:
+                key ^= _ZOBRIST_SQUARES[(piece.color, piece.king)][i]
+        return key
+
+    def to_squares(self):
+        """Return the 32-square encoding: one character per playable square,
+        "r"/"b" for men, "R"/"B" for kings and "." for empty."""
+        return "".join(str(piece) if piece != 0 else "." for piece in self.squares)
+
+    @classmethod
+    def from_squares(cls, squares):
+        """Build a Board from the 32-square encoding written by to_squares."""
+        if len(squares) != len(PLAYABLE_SQUARES):
+            raise ValueError(f"Expected 32 squares, got {len(squares)}: {squares!r}")
+        board = cls.__new__(cls)
+        board.squares = [0] * 32
+        for i, ((row, col), char) in enumerate(zip(PLAYABLE_SQUARES, squares)):
+            if char == ".":
+                continue
+            if char not in "rbRB":
+                raise ValueError(f"Invalid square {char!r} in {squares!r}")
+            board.squares[i] = Piece(row, col, char.lower(), king=char.isupper())
+        return board
+
+    def to_masks(self):
+        """Return (red, black, kings) bitmasks, bit i for PLAYABLE_SQUARES[i]."""
+        red = black = kings = 0
+        for i, piece in enumerate(self.squares):
+            if piece != 0:
+                if piece.color == "r":
+                    red |= 1 << i
+                else:
+                    black |= 1 << i
+                if piece.king:
+                    kings |= 1 << i
+        return red, black, kings
+
+    @classmethod
+    def from_masks(cls, red, black, kings):
+        """Build a Board from bitmasks written by to_masks."""
+        if red & black or kings & ~(red | black):
+            raise ValueError("Overlapping red/black masks or kings on empty squares")
+        board = cls.__new__(cls)
+        board.squares = [0] * 32
+        for i, (row, col) in enumerate(PLAYABLE_SQUARES):
+            bit = 1 << i
+            if (red | black) & bit:
+                color = "r" if red & bit else "b"
+                board.squares[i] = Piece(row, col, color, king=bool(kings & bit))
+        return board
+
+    def pack(self, turn="r"):
+        """Return the 13-byte packed encoding of this position with `turn` to move."""
+        return _PACKED.pack(*self.to_masks(), 0 if turn == "r" else 1)
+
+    @classmethod
+    def unpack(cls, data):
+        """Return (board, turn) from bytes written by pack."""
+        if len(data) != PACKED_SIZE:
+            raise ValueError(f"Expected {PACKED_SIZE} bytes, got {len(data)}")
+        red, black, kings, side = _PACKED.unpack(data)
+        if side not in (0, 1):
+            raise ValueError(f"Invalid side to move byte: {side}")
+        return cls.from_masks(red, black, kings), "rb"[side]
+
+    def to_fen(self, turn="r"):
+        """Return a PDN-style FEN string such as "R:R1,2,K9:B21,K30".
+
+        The first letter is the side to move, then each color lists its
+        squares (1-32, numbered along PLAYABLE_SQUARES) in ascending order,
+        kings prefixed with K.
+        """
+        lists = {"r": [], "b": []}
+        for i, piece in enumerate(self.squares):
+            if piece != 0:
+                lists[piece.color].append(("K" if piece.king else "") + str(i + 1))
+        return f"{turn.upper()}:R{','.join(lists['r'])}:B{','.join(lists['b'])}"
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Return (board, turn) from a FEN string written by to_fen.
+
+        Square ranges such as "1-12" or "K1-4" are also accepted.
+        """
+        parts = fen.strip().rstrip(".").split(":")
+        if len(parts) != 3 or parts[0] not in ("R", "B"):
+            raise ValueError(f"Invalid FEN: {fen!r}")
+
+        masks = {"r": 0, "b": 0}
+        kings = 0
+        for part in parts[1:]:
+            if not part or part[0] not in "RB":
+                raise ValueError(f"Invalid FEN: {fen!r}")
+            color = part[0].lower()
+            for item in filter(None, part[1:].split(",")):
+                king = item.startswith("K")
+                try:
+                    start, _, end = item.lstrip("K").partition("-")
+                    squares = range(int(start), int(end or start) + 1)
+                except ValueError:
+                    raise ValueError(f"Invalid square {item!r} in FEN {fen!r}")
+                for square in squares:
+                    if not 1 <= square <= 32:
+                        raise ValueError(f"Invalid square {square} in FEN {fen!r}")
+                    masks[color] |= 1 << (square - 1)
+                    if king:
+                        kings |= 1 << (square - 1)
+        return cls.from_masks(masks["r"], masks["b"], kings), parts[0].lower()
+
     def is_terminal(self):
         """Check if this is a terminal state (game over)."""
         red_count, black_count = self.count_pieces()
@@ -0,0 +1,162 @@
+# Persistent cache of search results, so positions that come up again (in
+# other games, other processes or later runs) are not searched again.
+#
+# Entries map a position hash (Board.hash_key, side to move included) to
+# the depth searched, the score and the best move. They live in a SQLite
+# file, behind an in-memory LRU of recently used entries; writes are
+# buffered and committed in batches, and the oldest entries are dropped
+# once the file holds more than max_entries.
+#
+# Usage: MinimaxAI("b", 6, cache=AnalysisCache("analysis.db"))
+#
+# A cached result ignores the game's repetition history and assumes the
+# same evaluation settings, so use one cache file per engine configuration.
+
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+
+def _to_signed(key):
+    # SQLite integers are signed 64-bit
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class AnalysisCache:
+    def __init__(self, path, memory_size=10000, batch_size=256, max_entries=1000000):
+        """Open (or create) the cache file at `path`.
+
+        Args:
+            memory_size (int): Entries kept in the in-memory LRU.
+            batch_size (int): Buffered writes committed together.
+            max_entries (int): Size limit of the file; the least recently
+                written entries are evicted beyond it (None for no limit).
+        """
+        self.path = path
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.pending = {}
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS positions (
+                               key INTEGER PRIMARY KEY,
+                               depth INTEGER NOT NULL,
+                               score REAL,
+                               move TEXT,
+                               written REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS positions_written ON positions (written)")
+        self.db.commit()
+        # Rows in the file, counted once here and then kept up to date by
+        # flush, so the size limit costs no table scan. Rows written by
+        # other processes are only seen when the cache is reopened.
+        self.count = self.db.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def get(self, key, depth):
+        """Return (depth, score, move) searched at least `depth` deep, or None.
+
+        The move is ((row, col), (row, col), [(row, col), ...]): start
+        square, destination and captured squares, or None if there was no
+        legal move.
+        """
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+        else:
+            entry = self.pending.get(key)
+            if entry is None:
+                row = self.db.execute(
+                    "SELECT depth, score, move FROM positions WHERE key = ?",
+                    (_to_signed(key),)).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1], self._decode_move(row[2]))
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None or entry[0] < depth:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return entry
+
+    def put(self, key, depth, score, move):
+        """Store a search result; shallower results never replace deeper ones."""
+        old = self.memory.get(key) or self.pending.get(key)
+        if old is not None and old[0] > depth:
+            return
+        entry = (depth, score, move)
+        self._remember(key, entry)
+        self.pending[key] = entry
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def flush(self):
+        """Commit the buffered writes and apply the size limit."""
+        if not self.pending:
+            return
+        now = time.time()
+        rows = [(_to_signed(key), depth, score, self._encode_move(move), now)
+                for key, (depth, score, move) in self.pending.items()]
+        with self.db:
+            # Insert new keys, counting them; existing keys are updated
+            # below, keeping the deeper result when another process wrote
+            # the same key
+            updates = []
+            for row in rows:
+                inserted = self.db.execute(
+                    """INSERT INTO positions (key, depth, score, move, written)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT (key) DO NOTHING""", row).rowcount
+                if inserted:
+                    self.count += 1
+                else:
+                    key, depth, score, move, written = row
+                    updates.append((depth, score, move, written, key, depth))
+            self.db.executemany(
+                """UPDATE positions SET depth = ?, score = ?, move = ?, written = ?
+                   WHERE key = ? AND depth <= ?""", updates)
+            self.stats["writes"] += len(rows)
+            self.pending.clear()
+
+            if self.max_entries is not None and self.count > self.max_entries:
+                deleted = self.db.execute(
+                    """DELETE FROM positions WHERE key IN
+                       (SELECT key FROM positions ORDER BY written LIMIT ?)""",
+                    (self.count - self.max_entries,)).rowcount
+                self.count -= deleted
+                self.stats["evictions"] += deleted
+
+    def __len__(self):
+        self.flush()
+        return self.count
+
+    def _encode_move(self, move):
+        return None if move is None else json.dumps(move)
+
+    def _decode_move(self, text):
+        if text is None:
+            return None
+        start, dest, captured = json.loads(text)
+        return tuple(start), tuple(dest), [tuple(square) for square in captured]
+
+    def close(self):
+        """Write any buffered entries and close the file."""
+        if self.db is not None:
+            self.flush()
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,19 +1,88 @@
-from board import Board, Piece
+from enum import Enum
+
+from board import JUMP_TARGET, NEIGHBOR, Board, Piece, square_index
+from history import PositionHistory
+
+
+class GameStatus(Enum):
+    ONGOING = "ongoing"
+    RED_WINS = "red_wins"
+    BLACK_WINS = "black_wins"
+    DRAW = "draw"
+
 
 # This file contains the Game class, which manages the game state and logic.
 # It handles player turns, valid moves, captures, and game over conditions.
 class Game:
-    def __init__(self):
-        """Initialize the game with a new board and set the starting player."""
-        self.board = Board()
-        self.turn = "r"
+    def __init__(self, board=None, turn="r"):
+        """Initialize the game with a new board and set the starting player.
+
+        Args:
+            board (Board): Optional position to start from instead of the
+                initial setup.
+            turn (str): Side to move first, "r" or "b".
+        """
+        if turn not in ("r", "b"):
+            raise ValueError(f"Invalid turn: {turn!r}")
+        self.board = board if board is not None else Board()
+        self.turn = turn
         # International Checkers rules state that jumps are mandatory
         # Force players to take jumps when available
         self.mandatory_jumps = True 
         # self.mandatory_jumps = False  # Allow players to choose between jumps and regular moves
+
+        # Draw rules: a position repeated this many times is a draw, and so is
+        # a run of this many plies with no capture or man move (None disables)
+        self.repetition_limit = 3
+        self.draw_move_limit = 80
+
+        # Hashes of the positions reached so far, for repetition detection
+        self.history = PositionHistory()
+        self.history.push(self.position_key())
+        # Set by move() when the current turn includes a capture or man move
+        self._irreversible = False
+        # Last result of status() and the state it was computed for
+        self._status_cache = (None, None)
+
     def switch_turn(self):
-        """Switch the current player's turn."""
+        """Switch the current player's turn and record the new position."""
         self.turn = "b" if self.turn == "r" else "r"
+        self.history.push(self.position_key(), self._irreversible)
+        self._irreversible = False
+
+    def position_key(self):
+        """Return the hash of the current position, including the side to move."""
+        return self.board.hash_key(self.turn)
+
+    def to_fen(self):
+        """Return the FEN string of the current position (see Board.to_fen)."""
+        return self.board.to_fen(self.turn)
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Start a game from a FEN string."""
+        board, turn = Board.from_fen(fen)
+        return cls(board, turn)
+
+    def pack(self):
+        """Return the packed encoding of the current position (see Board.pack)."""
+        return self.board.pack(self.turn)
+
+    @classmethod
+    def unpack(cls, data):
+        """Start a game from bytes written by pack."""
+        board, turn = Board.unpack(data)
+        return cls(board, turn)
+
+    def is_draw(self):
+        """Check the repetition and N-move draw rules."""
+        if (self.repetition_limit and
+                self.history.count(self.position_key()) >= self.repetition_limit):
+            return True
+        if (self.draw_move_limit and
+                self.history.plies_since_irreversible >= self.draw_move_limit):
+            return True
+        return False
 
     def get_valid_moves(self, piece):
         """Get all valid moves for a piece.
@@ -48,7 +117,7 @@ class Game:
 
         for dr, dc in directions:
             row, col = piece.row + dr, piece.col + dc
-            if 0 <= row < 8 and 0 <= col < 8 and self.board.board[row][col] == 0:
+            if 0 <= row < 8 and 0 <= col < 8 and self.board.squares[square_index(row, col)] == 0:
                 moves[(row, col)] = []
 
     def _get_directions(self, piece):
@@ -81,8 +150,10 @@ class Game:
             if (0 <= mid_row < 8 and 0 <= mid_col < 8 and
                     0 <= jump_row < 8 and 0 <= jump_col < 8):
 
-                mid_piece = self.board.board[mid_row][mid_col]
-                end_square = self.board.board[jump_row][jump_col]
+                squares = self.board.squares
+                mid_index = square_index(mid_row, mid_col)
+                mid_piece = squares[mid_index]
+                end_square = squares[square_index(jump_row, jump_col)]
 
                 if (mid_piece != 0 and mid_piece.color != piece.color and
                     end_square == 0 and
@@ -94,29 +165,34 @@ class Game:
                     moves[(jump_row, jump_col)] = new_captured
 
                     # Check for additional jumps (temporarily remove the jumped piece)
-                    temp = self.board.board[mid_row][mid_col]
-                    self.board.board[mid_row][mid_col] = 0
+                    temp = squares[mid_index]
+                    squares[mid_index] = 0
 
                     visited_with_jump = visited.union({(jump_row, jump_col)})
                     self._find_jumps(piece, jump_row, jump_col,
                                      new_captured, moves, visited_with_jump)
 
                     # Restore the jumped piece
-                    self.board.board[mid_row][mid_col] = temp
+                    squares[mid_index] = temp
 
     def has_valid_moves(self, color):
         """Check if a player has any valid moves."""
-        # Save original turn
-        original_turn = self.turn
-        self.turn = color
-
-        # Check if any piece has valid moves
-        pieces = self.board.get_all_pieces(color)
-        has_moves = any(self.get_valid_moves(piece) for piece in pieces)
-
-        # Restore original turn
-        self.turn = original_turn
-        return has_moves
+        return any(self._can_move(piece) for piece in self.board.get_all_pieces(color))
+
+    def _can_move(self, piece):
+        """Check if a piece has a regular move or a jump (without listing them)."""
+        squares = self.board.squares
+        start = square_index(piece.row, piece.col)
+        for direction in self._get_directions(piece):
+            target = NEIGHBOR[direction][start]
+            if target >= 0:
+                if squares[target] == 0:
+                    return True
+                jump = JUMP_TARGET[direction][start]
+                if (squares[target].color != piece.color and jump >= 0 and
+                        squares[jump] == 0):
+                    return True
+        return False
 
     def move(self, piece, row, col):
         """Move a piece and handle captures and promotions."""
@@ -132,12 +208,14 @@ class Game:
                 f"Invalid move to ({row}, {col}) for piece at ({piece.row}, {piece.col})")
 
         # Move the piece
-        self.board.board[piece.row][piece.col] = 0
+        self.board.squares[square_index(piece.row, piece.col)] = 0
         piece.row, piece.col = row, col
-        self.board.board[row][col] = piece
+        self.board.squares[square_index(row, col)] = piece
 
         # Handle captures
         jumped = valid_moves.get((row, col), [])
+        if jumped or not piece.king:
+            self._irreversible = True
         for j_row, j_col in jumped:
             self.remove_piece(j_row, j_col)
 
@@ -149,40 +227,56 @@ class Game:
 
     def remove_piece(self, row, col):
         """Remove a piece from the board."""
-        self.board.board[row][col] = 0
-
-    def is_game_over(self):
-        """Check if the game is over (no pieces or no moves for either side)."""
-        red_count, black_count = self.board.count_pieces()
+        self.board.squares[square_index(row, col)] = 0
 
-        # If one side has no pieces, we're done
-        if red_count == 0 or black_count == 0:
-            return True
+    def status(self):
+        """Return (GameStatus, red piece count, black piece count).
 
-        # Check moves for both players
-        red_can_move = self.has_valid_moves("r")
-        black_can_move = self.has_valid_moves("b")
+        Piece counts and the mobility of both sides are found in one pass
+        over the board, stopping the mobility checks for a side at its
+        first movable piece. The result is remembered until the position
+        or its repetition / N-move counters change.
+        """
+        key = self.position_key()
+        state = (key, self.history.count(key), self.history.plies_since_irreversible,
+                 self.repetition_limit, self.draw_move_limit)
+        if self._status_cache[0] == state:
+            return self._status_cache[1]
+
+        counts = {"r": 0, "b": 0}
+        can_move = {"r": False, "b": False}
+        for piece in self.board.squares:
+            if piece != 0:
+                counts[piece.color] += 1
+                if not can_move[piece.color]:
+                    can_move[piece.color] = self._can_move(piece)
+
+        if counts["r"] == 0:
+            result = GameStatus.BLACK_WINS
+        elif counts["b"] == 0:
+            result = GameStatus.RED_WINS
+        elif self.is_draw():
+            result = GameStatus.DRAW
+        elif not can_move["r"]:
+            result = GameStatus.BLACK_WINS
+        elif not can_move["b"]:
+            result = GameStatus.RED_WINS
+        else:
+            result = GameStatus.ONGOING
+
+        status = (result, counts["r"], counts["b"])
+        self._status_cache = (state, status)
+        return status
 
-        # Game is over if either side has no moves
-        return not (red_can_move and black_can_move)
+    def is_game_over(self):
+        """Check if the game is over (no pieces or no moves for either side, or a draw)."""
+        return self.status()[0] != GameStatus.ONGOING
 
     def get_winner(self):
-        """Determine the winner of the game."""
-        red_count, black_count = self.board.count_pieces()
-
-        # Check piece count
-        if red_count == 0:
-            return "Black"
-        if black_count == 0:
+        """Determine the winner of the game ("Red", "Black" or None)."""
+        result = self.status()[0]
+        if result == GameStatus.RED_WINS:
             return "Red"
-
-        # Check mobility
-        red_can_move = self.has_valid_moves("r")
-        black_can_move = self.has_valid_moves("b")
-
-        if not red_can_move:
+        if result == GameStatus.BLACK_WINS:
             return "Black"
-        if not black_can_move:
-            return "Red"
-        
         return None
@@ -0,0 +1,114 @@
+# This module keeps a compact history of position hashes for repetition
+# and draw detection. It is shared by Game (real moves) and MinimaxAI
+# (moves inside the search tree).
+
+from array import array
+
+
+class PositionHistory:
+    """A fixed-size ring buffer of 64-bit position hashes.
+
+    Alongside the buffer a dict counts how often each hash currently
+    appears, so repetition checks are O(1). The buffer can be used as a
+    stack: every push can be undone with pop(), even after it wrapped
+    around and overwrote the oldest entry, which is what the search needs
+    when it walks down and back up a line.
+
+    It also tracks how many plies have been played since the last
+    irreversible move (a capture or a man move), for the N-move draw rule.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._keys = array("Q", bytes(8 * capacity))
+        # Entry overwritten by the push into each slot, restored on pop
+        self._evicted = array("Q", bytes(8 * capacity))
+        self._did_evict = bytearray(capacity)
+        # Value of plies_since_irreversible before the push into each slot
+        self._prev_plies = array("I", bytes(4 * capacity))
+        self._counts = {}
+        self._head = 0  # Slot the next push writes to
+        self._size = 0
+        self.plies_since_irreversible = 0
+
+    def push(self, key, irreversible=False):
+        """Record a position reached by a move.
+
+        Args:
+            key (int): Position hash, e.g. from Board.hash_key.
+            irreversible (bool): True if the move that reached it was a
+                capture or a man move, which resets the draw counter.
+        """
+        idx = self._head
+        if self._size == self.capacity:
+            old = self._keys[idx]
+            self._evicted[idx] = old
+            self._did_evict[idx] = 1
+            self._discount(old)
+        else:
+            self._did_evict[idx] = 0
+            self._size += 1
+
+        self._keys[idx] = key
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self._prev_plies[idx] = self.plies_since_irreversible
+        self.plies_since_irreversible = 0 if irreversible else \
+            self.plies_since_irreversible + 1
+        self._head = (idx + 1) % self.capacity
+
+    def pop(self):
+        """Undo the most recent push and return its key."""
+        if self._size == 0:
+            raise IndexError("pop from empty PositionHistory")
+
+        idx = (self._head - 1) % self.capacity
+        key = self._keys[idx]
+        self._discount(key)
+        self.plies_since_irreversible = self._prev_plies[idx]
+
+        if self._did_evict[idx]:
+            old = self._evicted[idx]
+            self._keys[idx] = old
+            self._counts[old] = self._counts.get(old, 0) + 1
+        else:
+            self._size -= 1
+
+        self._head = idx
+        return key
+
+    def _discount(self, key):
+        remaining = self._counts[key] - 1
+        if remaining:
+            self._counts[key] = remaining
+        else:
+            del self._counts[key]
+
+    def count(self, key):
+        """Return how many times `key` occurs in the history."""
+        return self._counts.get(key, 0)
+
+    def last(self):
+        """Return the most recently pushed key, or None if empty."""
+        if self._size == 0:
+            return None
+        return self._keys[(self._head - 1) % self.capacity]
+
+    def copy(self):
+        """Return an independent copy (used to seed a search)."""
+        other = PositionHistory.__new__(PositionHistory)
+        other.capacity = self.capacity
+        other._keys = array("Q", self._keys)
+        other._evicted = array("Q", self._evicted)
+        other._did_evict = bytearray(self._did_evict)
+        other._prev_plies = array("I", self._prev_plies)
+        other._counts = dict(self._counts)
+        other._head = self._head
+        other._size = self._size
+        other.plies_since_irreversible = self.plies_since_irreversible
+        return other
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def __len__(self):
+        return self._size
@@ -0,0 +1,245 @@
+# Monte Carlo Tree Search engine, an alternative to AI.MinimaxAI with the
+# same choose_move(game) interface.
+#
+# Each iteration walks down the tree with UCT, adds one new node, plays the
+# game out from there and backs the result up the path. Playouts can be
+# farmed out to a process pool: several leaves are selected at once, with a
+# virtual loss on each selected path so the batch spreads over the tree.
+
+import math
+import random
+import time
+from multiprocessing import Pool
+
+from AI import EVAL_WEIGHTS, MinimaxAI
+from utils import tanh
+
+# UCT exploration constant
+EXPLORATION = 1.4
+# Playouts longer than this are scored by the evaluation (or as a draw)
+PLAYOUT_PLIES = 80
+# Evaluation units mapped to a reward of tanh(1) at a cut-off playout
+EVAL_SCALE = 3.0
+
+
+def apply_move(board, move):
+    """Return a copy of `board` with `move` played on it."""
+    piece, dest, captured = move
+    next_board = board.copy()
+    next_board.make_move((next_board.board[piece.row][piece.col], dest, captured))
+    return next_board
+
+
+def playout(board, turn, seed, max_plies=PLAYOUT_PLIES, policy="random", weights=None):
+    """Play a game out from `board` and return the result for red.
+
+    Args:
+        board (Board): Starting position (not modified).
+        turn (str): Side to move, "r" or "b".
+        seed: Seed for this playout's random moves.
+        policy (str): "random" picks uniformly; "eval" plays the move with
+            the best static evaluation most of the time.
+        weights (dict): Evaluation weights for the "eval" policy and for
+            scoring playouts that hit max_plies.
+
+    Returns:
+        float: +1 if red wins, -1 if black wins, and for unfinished
+        playouts a value in (-1, 1) from the evaluation (0 with the random
+        policy).
+    """
+    rng = random.Random(seed)
+    board = board.copy()
+    evaluator = MinimaxAI("r", weights=weights or EVAL_WEIGHTS)
+
+    for _ in range(max_plies):
+        moves = board.get_all_moves(turn)
+        if not moves:
+            return -1.0 if turn == "r" else 1.0
+
+        if policy == "eval" and rng.random() < 0.9:
+            sign = 1 if turn == "r" else -1
+            move = max(moves, key=lambda m: sign * evaluator.evaluate(apply_move(board, m)))
+        else:
+            move = rng.choice(moves)
+
+        piece, dest, captured = move
+        board.make_move((piece, dest, captured))
+        turn = "b" if turn == "r" else "r"
+
+    if policy == "eval":
+        return float(tanh(evaluator.evaluate(board) / EVAL_SCALE))
+    return 0.0
+
+
+def _playout_task(args):
+    return playout(*args)
+
+
+class MCTSNode:
+    """A position in the search tree.
+
+    `value` is the summed reward from the point of view of the player who
+    made the move into this node, so a parent simply picks the child with
+    the best average.
+    """
+
+    def __init__(self, board, turn, parent=None, move=None):
+        self.board = board
+        self.turn = turn  # Side to move in this position
+        self.parent = parent
+        self.move = move  # Move that led here from the parent
+        self.children = []
+        self.untried = board.get_all_moves(turn)
+        self.visits = 0
+        self.value = 0.0
+        self.key = board.hash_key(turn)
+
+    def is_terminal(self):
+        return not self.children and not self.untried
+
+    def best_child(self, exploration=EXPLORATION):
+        """Return the child with the highest UCT score."""
+        log_visits = math.log(max(self.visits, 1))
+        return max(self.children, key=lambda child:
+                   child.value / child.visits +
+                   exploration * math.sqrt(log_visits / child.visits))
+
+    def expand(self, rng):
+        """Add a child for one untried move and return it."""
+        move = self.untried.pop(rng.randrange(len(self.untried)))
+        next_turn = "b" if self.turn == "r" else "r"
+        child = MCTSNode(apply_move(self.board, move), next_turn, self, move)
+        self.children.append(child)
+        return child
+
+
+class MCTSAI:
+    def __init__(self, color, iterations=1000, time_limit=None, processes=None,
+                 policy="random", max_plies=PLAYOUT_PLIES, seed=None, weights=None):
+        """Monte Carlo Tree Search player.
+
+        Args:
+            color (str): "r" or "b".
+            iterations (int): Playouts per move.
+            time_limit (float): Optional seconds per move; the search stops
+                at whichever of the two limits comes first.
+            processes (int): Run playouts on a pool of this many processes.
+            policy (str): Playout policy, "random" or "eval".
+        """
+        self.color = color
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.processes = processes
+        self.policy = policy
+        self.max_plies = max_plies
+        self.weights = weights or EVAL_WEIGHTS
+        self.rng = random.Random(seed)
+        self.root = None
+        self.pool = None
+        self.stats = {"playouts": 0, "reused_visits": 0, "tree_nodes": 0}
+
+    def choose_move(self, game):
+        """Choose the most visited move after running the search."""
+        self.stats = {"playouts": 0, "reused_visits": 0, "tree_nodes": 0}
+        root = self.reuse_tree(game)
+        if root.is_terminal():
+            return None
+
+        batch_size = self.processes or 1
+        if self.processes and self.pool is None:
+            self.pool = Pool(self.processes)
+
+        deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+        done = 0
+        # Always expand the root at least once, so there is a move to pick
+        while done < self.iterations or not root.children:
+            if deadline and time.perf_counter() > deadline and root.children:
+                break
+            count = max(1, min(batch_size, self.iterations - done))
+            leaves = [self.select(root) for _ in range(count)]
+            tasks = [(leaf.board, leaf.turn, self.rng.random(), self.max_plies,
+                      self.policy, self.weights)
+                     for leaf in leaves if not leaf.is_terminal()]
+            if self.pool is not None:
+                results = iter(self.pool.map(_playout_task, tasks))
+            else:
+                results = iter([_playout_task(task) for task in tasks])
+
+            for leaf in leaves:
+                if leaf.is_terminal():
+                    # The side to move has no moves and loses
+                    reward = -1.0 if leaf.turn == "r" else 1.0
+                else:
+                    reward = next(results)
+                self.backpropagate(leaf, reward)
+            done += len(leaves)
+            self.stats["playouts"] += len(tasks)
+
+        best = max(root.children, key=lambda child: child.visits)
+        self.stats["tree_nodes"] = self.count_nodes(root)
+        # Keep the chosen subtree for the next move
+        self.root = best
+
+        piece, dest, captured = best.move
+        real_piece = game.board.board[piece.row][piece.col]
+        return real_piece, dest, captured
+
+    def reuse_tree(self, game):
+        """Return the node for the current position, reusing the old tree.
+
+        After our last move the tree root is that move's node; the
+        opponent's reply is one of its children.
+        """
+        key = game.board.hash_key(game.turn)
+        candidates = []
+        if self.root is not None:
+            candidates = [self.root] + self.root.children
+        for node in candidates:
+            if node.key == key and node.turn == game.turn:
+                node.parent = None
+                self.stats["reused_visits"] = node.visits
+                return node
+        return MCTSNode(game.board.copy(), game.turn)
+
+    def select(self, root):
+        """Walk down with UCT to a new or terminal leaf, adding virtual loss.
+
+        Every node on the path gets a visit and a loss in advance, so the
+        next selection of the same batch prefers other lines; backpropagate
+        replaces the loss with the real result.
+        """
+        node = root
+        node.visits += 1
+        while not node.untried and node.children:
+            node = node.best_child()
+            node.visits += 1
+            node.value -= 1.0
+        if node.untried:
+            node = node.expand(self.rng)
+            node.visits += 1
+            node.value -= 1.0
+        return node
+
+    def backpropagate(self, node, reward):
+        """Add a playout result (+1 red win, -1 black win) along the path."""
+        while node.parent is not None:
+            mover = node.parent.turn
+            # Undo the virtual loss and add the real result
+            node.value += 1.0 + (reward if mover == "r" else -reward)
+            node = node.parent
+
+    def count_nodes(self, node):
+        return 1 + sum(self.count_nodes(child) for child in node.children)
+
+    def close(self):
+        """Shut down the playout pool, if any."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,159 @@
+# A small neural-network evaluator for MinimaxAI, written in NumPy.
+#
+# The network reads the 32-square board encoding (Board.to_squares) as four
+# one-hot planes (red men, red kings, black men, black kings), has one ReLU
+# hidden layer and a tanh output: +1 means red is winning, -1 black. It
+# evaluates whole batches of positions in one forward pass, which is what
+# makes a learned evaluator affordable from Python.
+#
+# Usage: MinimaxAI("b", 4, evaluator=MLPEvaluator.load("mlp.npz"))
+
+import argparse
+
+import numpy as np
+
+from utils import relu, tanh, tanh_derivative
+
+# Maps an encoding character to its one-hot plane
+_PLANES = np.zeros((256, 4), dtype=np.float32)
+for _plane, _char in enumerate("rRbB"):
+    _PLANES[ord(_char), _plane] = 1.0
+
+INPUT_SIZE = 32 * 4
+
+
+def encode(squares):
+    """Turn an (N, 32) uint8 array of encoding characters into (N, 128) inputs."""
+    return _PLANES[squares].reshape(len(squares), INPUT_SIZE)
+
+
+def boards_to_squares(boards):
+    """Stack the 32-square encodings of several boards into an (N, 32) array."""
+    data = "".join(board.to_squares() for board in boards).encode()
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 32)
+
+
+class MLPEvaluator:
+    """A 128 -> hidden -> 1 multilayer perceptron scoring positions for red."""
+
+    def __init__(self, hidden=32, seed=0):
+        rng = np.random.default_rng(seed)
+        # He initialization for the ReLU layer
+        self.w1 = (rng.standard_normal((INPUT_SIZE, hidden)) *
+                   np.sqrt(2.0 / INPUT_SIZE)).astype(np.float32)
+        self.b1 = np.zeros(hidden, dtype=np.float32)
+        self.w2 = (rng.standard_normal((hidden, 1)) *
+                   np.sqrt(1.0 / hidden)).astype(np.float32)
+        self.b2 = np.zeros(1, dtype=np.float32)
+
+    def forward(self, x):
+        """Return (hidden activations, outputs) for an (N, 128) input batch."""
+        hidden = relu(x @ self.w1 + self.b1)
+        return hidden, tanh(hidden @ self.w2 + self.b2)[:, 0]
+
+    def evaluate_squares(self, squares):
+        """Score an (N, 32) array of encoded positions, from red's point of view."""
+        return self.forward(encode(squares))[1]
+
+    def evaluate_batch(self, boards):
+        """Score a list of Boards in one forward pass, from red's point of view."""
+        if not boards:
+            return np.zeros(0, dtype=np.float32)
+        return self.evaluate_squares(boards_to_squares(boards))
+
+    def evaluate(self, board):
+        """Score a single Board from red's point of view."""
+        return float(self.evaluate_batch([board])[0])
+
+    def train(self, squares, results, epochs=10, batch_size=1024, lr=1e-3, seed=0):
+        """Fit the network to game results with mini-batch Adam.
+
+        Args:
+            squares: (N, 32) uint8 array of encoded positions.
+            results: (N,) results from red's point of view (1, 0.5 or 0),
+                mapped to tanh targets of +1, 0 and -1.
+
+        Returns:
+            list: Mean squared error of each epoch.
+        """
+        rng = np.random.default_rng(seed)
+        targets = (2.0 * np.asarray(results, dtype=np.float32) - 1.0)
+        params = [self.w1, self.b1, self.w2, self.b2]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+        losses = []
+
+        for _ in range(epochs):
+            order = rng.permutation(len(squares))
+            total = 0.0
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                x = encode(squares[idx])
+                y = targets[idx]
+
+                hidden, out = self.forward(x)
+                error = out - y
+                total += float(error @ error)
+
+                # Backpropagate the mean squared error
+                d_out = (2.0 / len(idx)) * error * tanh_derivative(out)
+                d_hidden = (d_out[:, None] @ self.w2.T) * (hidden > 0)
+                grads = [x.T @ d_hidden, d_hidden.sum(axis=0),
+                         hidden.T @ d_out[:, None], d_out.sum(keepdims=True)]
+
+                step += 1
+                for p, g, m_i, v_i in zip(params, grads, m, v):
+                    m_i *= beta1
+                    m_i += (1 - beta1) * g
+                    v_i *= beta2
+                    v_i += (1 - beta2) * g * g
+                    m_hat = m_i / (1 - beta1 ** step)
+                    v_hat = v_i / (1 - beta2 ** step)
+                    p -= (lr * m_hat / (np.sqrt(v_hat) + eps)).astype(p.dtype)
+
+            losses.append(total / len(squares))
+        return losses
+
+    def save(self, path):
+        """Write the weights to an .npz file."""
+        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2)
+
+    @classmethod
+    def load(cls, path):
+        """Read weights written by save()."""
+        with np.load(path) as data:
+            evaluator = cls.__new__(cls)
+            evaluator.w1 = data["w1"].astype(np.float32)
+            evaluator.b1 = data["b1"].astype(np.float32)
+            evaluator.w2 = data["w2"].astype(np.float32)
+            evaluator.b2 = data["b2"].astype(np.float32)
+        if evaluator.w1.shape[0] != INPUT_SIZE:
+            raise ValueError(f"Expected {INPUT_SIZE} inputs, got {evaluator.w1.shape[0]}")
+        return evaluator
+
+
+def main():
+    from tuning import load_corpus
+
+    parser = argparse.ArgumentParser(
+        description="Train the MLP evaluator on a self-play corpus.")
+    parser.add_argument("corpus", help="file of '<32 squares> <result>' lines")
+    parser.add_argument("--output", default="mlp.npz")
+    parser.add_argument("--hidden", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    squares, results = load_corpus(args.corpus)
+    evaluator = MLPEvaluator(args.hidden)
+    losses = evaluator.train(squares, results, args.epochs, args.batch_size, args.lr)
+    for epoch, loss in enumerate(losses, 1):
+        print(f"epoch {epoch}: mse {loss:.4f}")
+    evaluator.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Additive pattern databases for the sliding-tile puzzles in search.py.
+#
+# The tiles are split into disjoint groups. For each group, a breadth-first
+# search from the goal over the positions of just that group's tiles (and
+# the blank) finds how many moves of those tiles it takes to put them in
+# place. Moving the blank over a tile of another group is free, so the
+# distances of the groups can be added and the sum is still an admissible,
+# consistent heuristic for A*.
+#
+# Each table is a NumPy uint8 array indexed by the positions of the tiles
+# and of the blank written in base n (n = number of squares), so a lookup
+# is one index computation. Keeping the blank in the index (rather than the
+# minimum over blank positions) keeps the sum consistent: one move changes
+# each group's entry by at most the cost of that move for the group.
+# Tables can be saved to a directory and are then loaded with
+# np.load(mmap_mode='r'), so later runs and other processes share them
+# through the page cache instead of rebuilding them.
+#
+# Usage:
+#     db = PatternDatabase(FifteenPuzzle.GOAL, cache_dir="pdb")
+#     astar_search(FifteenPuzzle(state, pattern_db=db))
+
+import hashlib
+import os
+
+import numpy as np
+
+UNREACHED = 255
+
+# Default tile groups; other sizes get consecutive groups of up to 5 tiles
+DEFAULT_GROUPS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)),
+}
+
+
+def neighbor_table(width):
+    """Return a (4, n) array: the square reached from each square going
+    up, down, left and right, or -1 off the board."""
+    n = width * width
+    table = np.full((4, n), -1, dtype=np.int64)
+    for i in range(n):
+        row, col = divmod(i, width)
+        if row > 0:
+            table[0, i] = i - width
+        if row < width - 1:
+            table[1, i] = i + width
+        if col > 0:
+            table[2, i] = i - 1
+        if col < width - 1:
+            table[3, i] = i + 1
+    return table
+
+
+def build_table(goal, tiles):
+    """Return the distance table of one tile group.
+
+    A state of the search is the positions of the tiles and then of the
+    blank, coded as sum(position * n**i); the table holds the distance of
+    every code (UNREACHED for impossible ones). Moves of the group's tiles
+    cost 1 and moves over other tiles cost 0, so each distance layer is
+    first closed under the free moves before the next layer is generated.
+    """
+    n = len(goal)
+    width = int(round(n ** 0.5))
+    k = len(tiles)
+    powers = n ** np.arange(k + 1, dtype=np.int64)
+    neighbors = neighbor_table(width)
+
+    def successors(codes):
+        # Return (free, costly) successor codes of an array of states
+        positions = (codes[:, None] // powers[:k]) % n
+        blank = codes // powers[k]
+        free, costly = [], []
+        for direction in range(4):
+            target = neighbors[direction, blank]
+            valid = target >= 0
+            moved = codes[valid] + (target[valid] - blank[valid]) * powers[k]
+            hit = positions[valid] == target[valid, None]
+            occupied = hit.any(axis=1)
+            free.append(moved[~occupied])
+            # The tile on the target square slides to where the blank was
+            tile = hit[occupied].argmax(axis=1)
+            costly.append(moved[occupied] +
+                          (blank[valid][occupied] - target[valid][occupied]) * powers[tile])
+        return np.concatenate(free), np.concatenate(costly)
+
+    start = sum(goal.index(tile) * int(powers[i]) for i, tile in enumerate(tiles))
+    start += goal.index(0) * int(powers[k])
+    table = np.full(n ** (k + 1), UNREACHED, dtype=np.uint8)
+    frontier = np.array([start], dtype=np.int64)
+    distance = 0
+    while frontier.size:
+        if distance >= UNREACHED:
+            raise ValueError("Pattern distances do not fit in a byte")
+        table[frontier] = distance
+        costly = []
+        while frontier.size:
+            free, more = successors(frontier)
+            costly.append(more)
+            frontier = np.unique(free)
+            frontier = frontier[table[frontier] == UNREACHED]
+            table[frontier] = distance
+
+        frontier = np.unique(np.concatenate(costly))
+        frontier = frontier[table[frontier] == UNREACHED]
+        distance += 1
+    return table
+
+
+class PatternDatabase:
+    def __init__(self, goal, groups=None, cache_dir=None):
+        """Build (or load) the tables for a puzzle with the given goal state.
+
+        Args:
+            goal (tuple): Goal state, tiles row by row with 0 for the blank.
+            groups: Disjoint tuples of tiles, one table each. Together they
+                should cover every tile for the best estimates.
+            cache_dir (str): Directory where tables are saved and looked
+                for; None keeps them in memory only.
+        """
+        self.goal = tuple(goal)
+        self.n = len(self.goal)
+        self.width = int(round(self.n ** 0.5))
+        if self.width * self.width != self.n or sorted(self.goal) != list(range(self.n)):
+            raise ValueError("The goal must hold the tiles 0 to n-1 on a square board")
+        if groups is None:
+            groups = DEFAULT_GROUPS.get(self.width)
+        if groups is None:
+            tiles = list(range(1, self.n))
+            groups = [tuple(tiles[i:i + 5]) for i in range(0, len(tiles), 5)]
+        groups = [tuple(group) for group in groups]
+        used = [tile for group in groups for tile in group]
+        if len(used) != len(set(used)) or not set(used) <= set(range(1, self.n)):
+            raise ValueError("Groups must be disjoint sets of tiles")
+
+        self.patterns = []
+        for tiles in groups:
+            powers = [self.n ** i for i in range(len(tiles) + 1)]
+            self.patterns.append((tiles, powers, self._load(tiles, cache_dir)))
+
+    def _load(self, tiles, cache_dir):
+        if cache_dir is None:
+            return build_table(self.goal, tiles)
+        goal_key = hashlib.md5(bytes(self.goal)).hexdigest()[:8]
+        path = os.path.join(cache_dir, "pdb_%dx%d_%s_%s.npy" % (
+            self.width, self.width, goal_key, "-".join(map(str, tiles))))
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so readers never see half a table
+            temp = "%s.%d.tmp.npy" % (path[:-4], os.getpid())
+            np.save(temp, build_table(self.goal, tiles))
+            os.replace(temp, path)
+        return np.load(path, mmap_mode='r')
+
+    def distance(self, state):
+        """Return the heuristic estimate of the moves from state to the goal."""
+        position = [0] * self.n
+        for square, tile in enumerate(state):
+            position[tile] = square
+        total = 0
+        blank = position[0]
+        for tiles, powers, table in self.patterns:
+            index = blank * powers[-1]
+            for tile, power in zip(tiles, powers):
+                index += position[tile] * power
+            total += int(table[index])
+        return total
+
+    def h(self, node):
+        """Heuristic for search nodes, like Problem.h."""
+        return self.distance(node.state)
@@ -6,8 +6,13 @@ then create problem instances and solve them with calls to the various search
 functions.
 """
 
+import copy
+import heapq
+import itertools
 import sys
+import time
 from collections import deque
+from multiprocessing import Pool
 
 from utils import *
 
@@ -213,7 +218,7 @@ def depth_first_tree_search(problem):
     return None
 
 
-def depth_first_graph_search(problem):
+def depth_first_graph_search(problem, key=None):
     """
     [Figure 3.7]
     Search the deepest nodes in the search tree first.
@@ -221,39 +226,60 @@ def depth_first_graph_search(problem):
     The argument frontier should be an empty queue.
     Does not get trapped by loops.
     If two paths reach a state, only use the first one.
+    The states on the frontier are also kept in a set, so checking a child
+    against the frontier takes constant time. key(state), if given, is
+    stored in the explored and frontier sets instead of the state itself;
+    use it to map large states to compact hashable keys.
     """
-    frontier = [(Node(problem.initial))]  # Stack
+    key = key or identity
+    node = Node(problem.initial)
+    frontier = [node]  # Stack
+    in_frontier = {key(node.state)}
 
     explored = set()
     while frontier:
         node = frontier.pop()
+        state_key = key(node.state)
+        in_frontier.discard(state_key)
         if problem.goal_test(node.state):
             return node
-        explored.add(node.state)
-        frontier.extend(child for child in node.expand(problem)
-                        if child.state not in explored and child not in frontier)
+        explored.add(state_key)
+        for child in node.expand(problem):
+            child_key = key(child.state)
+            if child_key not in explored and child_key not in in_frontier:
+                frontier.append(child)
+                in_frontier.add(child_key)
     return None
 
 
-def breadth_first_graph_search(problem):
+def breadth_first_graph_search(problem, key=None):
     """[Figure 3.11]
     Note that this function can be implemented in a
     single line as below:
     return graph_search(problem, FIFOQueue())
+    As in depth_first_graph_search, a set of the frontier states gives
+    constant-time duplicate checks, and key(state) can replace the states
+    stored in the sets.
     """
+    key = key or identity
     node = Node(problem.initial)
     if problem.goal_test(node.state):
         return node
     frontier = deque([node])
+    in_frontier = {key(node.state)}
     explored = set()
     while frontier:
         node = frontier.popleft()
-        explored.add(node.state)
+        state_key = key(node.state)
+        in_frontier.discard(state_key)
+        explored.add(state_key)
         for child in node.expand(problem):
-            if child.state not in explored and child not in frontier:
+            child_key = key(child.state)
+            if child_key not in explored and child_key not in in_frontier:
                 if problem.goal_test(child.state):
                     return child
                 frontier.append(child)
+                in_frontier.add(child_key)
     return None
 
 
@@ -292,32 +318,101 @@ def uniform_cost_search(problem, display=False):
     return best_first_graph_search(problem, lambda node: node.path_cost, display)
 
 
-def depth_limited_search(problem, limit=50):
-    """[Figure 3.17]"""
-
-    def recursive_dls(node, problem, limit):
-        if problem.goal_test(node.state):
-            return node
-        elif limit == 0:
+def depth_limited_search(problem, limit=50, path_cache=0, order=None, order_size=100000):
+    """[Figure 3.17]
+    Uses an explicit stack instead of recursion, so deep limits do not hit
+    Python's recursion limit, and creates each child only when it is
+    reached. Returns the goal node, 'cutoff' or None as the recursive
+    version did.
+    path_cache: if positive, children whose state is one of the last
+    path_cache states on the current path are skipped, so short cycles
+    are not searched again and again.
+    order: a dict to keep between calls (see iterative_deepening_search),
+    holding the actions of up to order_size expanded states. Actions whose
+    subtree was searched to the end without a cutoff can never lead to the
+    goal and are dropped from it (unless path_cache is used, since the
+    skipped cycles depend on the path)."""
+    node = Node(problem.initial)
+    if problem.goal_test(node.state):
+        return node
+    if limit == 0:
+        return 'cutoff'
+    prune = order is not None and not path_cache
+    goal_test, get_actions = problem.goal_test, problem.actions
+    on_path = {}
+
+    def actions(state):
+        if order is None:
+            return list(get_actions(state))
+        node_actions = order.get(state)
+        if node_actions is None:
+            node_actions = list(get_actions(state))
+            if len(order) < order_size:
+                order[state] = node_actions
+        return node_actions
+
+    def enter(state):
+        on_path[state] = on_path.get(state, 0) + 1
+
+    def leave(state):
+        on_path[state] -= 1
+        if not on_path[state]:
+            del on_path[state]
+
+    # A frame holds a node, its actions, the index of the next action,
+    # whether a cutoff occurred below it and the actions found to be dead ends
+    stack = [[node, actions(node.state), 0, False, []]]
+    if path_cache:
+        enter(node.state)
+    while stack:
+        frame = stack[-1]
+        node, node_actions, i = frame[0], frame[1], frame[2]
+        if i < len(node_actions):
+            frame[2] = i + 1
+            child = node.child_node(problem, node_actions[i])
+            if goal_test(child.state):
+                return child
+            if len(stack) == limit:
+                frame[3] = True
+            elif path_cache:
+                if child.state not in on_path:
+                    stack.append([child, actions(child.state), 0, False, []])
+                    enter(child.state)
+                    if len(stack) > path_cache:
+                        leave(stack[-path_cache - 1][0].state)
+            else:
+                stack.append([child, actions(child.state), 0, False, []])
+            continue
+
+        # Every child of node has been searched
+        stack.pop()
+        if path_cache:
+            leave(node.state)
+            if len(stack) >= path_cache:
+                enter(stack[-path_cache][0].state)
+        if prune and frame[4] and node.state in order:
+            dead = frame[4]
+            order[node.state] = [action for action in node_actions if action not in dead]
+        if stack:
+            parent = stack[-1]
+            if frame[3]:
+                parent[3] = True
+            elif prune:
+                parent[4].append(parent[1][parent[2] - 1])
+        elif frame[3]:
             return 'cutoff'
-        else:
-            cutoff_occurred = False
-            for child in node.expand(problem):
-                result = recursive_dls(child, problem, limit - 1)
-                if result == 'cutoff':
-                    cutoff_occurred = True
-                elif result is not None:
-                    return result
-            return 'cutoff' if cutoff_occurred else None
-
-    # Body of depth_limited_search:
-    return recursive_dls(Node(problem.initial), problem, limit)
+    return None
 
 
-def iterative_deepening_search(problem):
-    """[Figure 3.18]"""
+def iterative_deepening_search(problem, reuse_order=False, path_cache=0, order_size=100000):
+    """[Figure 3.18]
+    reuse_order: keep the action lists of expanded states from one depth to
+    the next, so actions are not recomputed and subtrees that ran out of
+    moves are not searched again. path_cache is passed on to
+    depth_limited_search."""
+    order = {} if reuse_order else None
     for depth in range(sys.maxsize):
-        result = depth_limited_search(problem, depth)
+        result = depth_limited_search(problem, depth, path_cache, order, order_size)
         if result != 'cutoff':
             return result
 
@@ -426,11 +521,22 @@ def astar_search(problem, h=None, display=False):
 class EightPuzzle(Problem):
     """ The problem of sliding tiles numbered from 1 to 8 on a 3x3 board, where one of the
     squares is a blank. A state is represented as a tuple of length 9, where  element at
-    index i represents the tile number  at index i (0 if it's an empty square) """
+    index i represents the tile number  at index i (0 if it's an empty square).
+    The board size follows the goal, so a longer goal gives a larger puzzle
+    (see FifteenPuzzle). With a patterndb.PatternDatabase for the goal,
+    h uses its additive pattern distances instead of misplaced tiles. """
+
+    GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
 
-    def __init__(self, initial, goal=(1, 2, 3, 4, 5, 6, 7, 8, 0)):
+    def __init__(self, initial, goal=None, pattern_db=None):
         """ Define goal state and initialize a problem """
-        super().__init__(initial, goal)
+        super().__init__(initial, tuple(goal or self.GOAL))
+        self.width = int(round(len(self.goal) ** 0.5))
+        if self.width * self.width != len(self.goal):
+            raise ValueError("The puzzle board must be square")
+        if pattern_db is not None and pattern_db.goal != self.goal:
+            raise ValueError("The pattern database was built for another goal")
+        self.pattern_db = pattern_db
 
     def find_blank_square(self, state):
         """Return the index of the blank square in a given state"""
@@ -444,14 +550,15 @@ class EightPuzzle(Problem):
 
         possible_actions = ['UP', 'DOWN', 'LEFT', 'RIGHT']
         index_blank_square = self.find_blank_square(state)
+        width = self.width
 
-        if index_blank_square % 3 == 0:
+        if index_blank_square % width == 0:
             possible_actions.remove('LEFT')
-        if index_blank_square < 3:
+        if index_blank_square < width:
             possible_actions.remove('UP')
-        if index_blank_square % 3 == 2:
+        if index_blank_square % width == width - 1:
             possible_actions.remove('RIGHT')
-        if index_blank_square > 5:
+        if index_blank_square >= len(state) - width:
             possible_actions.remove('DOWN')
 
         return possible_actions
@@ -464,7 +571,7 @@ class EightPuzzle(Problem):
         blank = self.find_blank_square(state)
         new_state = list(state)
 
-        delta = {'UP': -3, 'DOWN': 3, 'LEFT': -1, 'RIGHT': 1}
+        delta = {'UP': -self.width, 'DOWN': self.width, 'LEFT': -1, 'RIGHT': 1}
         neighbor = blank + delta[action]
         new_state[blank], new_state[neighbor] = new_state[neighbor], new_state[blank]
 
@@ -476,7 +583,7 @@ class EightPuzzle(Problem):
         return state == self.goal
 
     def check_solvability(self, state):
-        """ Checks if the given state is solvable """
+        """ Checks if the given state is solvable (for the default goal) """
 
         inversion = 0
         for i in range(len(state)):
@@ -484,15 +591,27 @@ class EightPuzzle(Problem):
                 if (state[i] > state[j]) and state[i] != 0 and state[j] != 0:
                     inversion += 1
 
-        return inversion % 2 == 0
+        if self.width % 2:
+            return inversion % 2 == 0
+        # On even widths every vertical move of the blank also flips the parity
+        blank_row_from_bottom = self.width - self.find_blank_square(state) // self.width
+        return (inversion + blank_row_from_bottom) % 2 == 1
 
     def h(self, node):
         """ Return the heuristic value for a given state. Default heuristic function used is 
         h(n) = number of misplaced tiles """
 
+        if self.pattern_db is not None:
+            return self.pattern_db.distance(node.state)
         return sum(s != g for (s, g) in zip(node.state, self.goal))
 
 
+class FifteenPuzzle(EightPuzzle):
+    """ The 4x4 version of EightPuzzle, with tiles 1 to 15 """
+
+    GOAL = tuple(range(1, 16)) + (0,)
+
+
 # ______________________________________________________________________________
 
 
@@ -632,6 +751,165 @@ def recursive_best_first_search(problem, h=None):
     return result
 
 
+def ida_star_search(problem, h=None, table_size=100000):
+    """Iterative deepening A*: depth-first searches bounded by f = g + h,
+    where each new bound is the smallest f that went over the last one.
+    Only the current path is kept, plus a table of up to table_size states
+    with the lowest g each was reached with in this iteration; reaching a
+    state again at no lower cost is pruned, so transpositions and cycles
+    are not searched twice."""
+    h = memoize(h or problem.h, 'h')
+
+    def search(node, bound, path, table):
+        f = node.path_cost + h(node)
+        if f > bound:
+            return None, f
+        if problem.goal_test(node.state):
+            return node, f
+        smallest = np.inf
+        for child in node.expand(problem):
+            if child.state in path:
+                continue
+            best_g = table.get(child.state)
+            if best_g is not None and best_g <= child.path_cost:
+                continue
+            if best_g is not None or len(table) < table_size:
+                table[child.state] = child.path_cost
+            path.add(child.state)
+            result, t = search(child, bound, path, table)
+            path.discard(child.state)
+            if result is not None:
+                return result, t
+            smallest = min(smallest, t)
+        return None, smallest
+
+    node = Node(problem.initial)
+    bound = h(node)
+    while bound < np.inf:
+        result, bound = search(node, bound, {node.state}, {node.state: 0})
+        if result is not None:
+            return result
+    return None
+
+
+def sma_star_search(problem, h=None, max_nodes=10000):
+    """Simplified memory-bounded A* [Russell 1992]: A* that keeps at most
+    max_nodes nodes in memory. Successors are generated one at a time from
+    the deepest node with the lowest f. When memory is full, the worst leaf
+    (highest f, then shallowest) is dropped and its parent remembers the
+    leaf's f, so the subtree is only regenerated once every other path
+    looks worse. Finds an optimal solution whenever its path fits in
+    memory; returns None if no solution does."""
+    h = memoize(h or problem.h, 'h')
+    seq = itertools.count()
+    frontier, leaves = [], []
+
+    def push_frontier(node):
+        # Deepest least-f node first, newest on ties
+        node.frontier_key = (node.f, -node.depth, -node.seq, node)
+        heapq.heappush(frontier, node.frontier_key)
+
+    def push_leaf(node):
+        # Highest-f leaf first, then shallowest, oldest on ties
+        node.leaf_key = (-node.f, node.depth, node.seq, node)
+        heapq.heappush(leaves, node.leaf_key)
+
+    def pop(heap, attr):
+        while heap:
+            entry = heapq.heappop(heap)
+            node = entry[-1]
+            if node.kept and getattr(node, attr) is entry:
+                setattr(node, attr, None)
+                return node
+        return None
+
+    def add(node, f):
+        node.f = f
+        node.seq = next(seq)
+        node.pending = deque(problem.actions(node.state))
+        node.children = []
+        node.forgotten = {}
+        node.kept = True
+        push_frontier(node)
+        push_leaf(node)
+
+    def on_path(node, state):
+        while node is not None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+    def drop_worst_leaf(expanding):
+        skipped = []
+        leaf = pop(leaves, 'leaf_key')
+        while leaf is not None and (leaf is expanding or leaf.parent is None):
+            skipped.append(leaf)
+            leaf = pop(leaves, 'leaf_key')
+        for node in skipped:
+            push_leaf(node)
+        if leaf is None:
+            return False
+        leaf.kept = False
+        parent = leaf.parent
+        parent.children = [child for child in parent.children if child is not leaf]
+        parent.forgotten[leaf.action] = leaf.f
+        parent.pending.append(leaf.action)
+        if parent.frontier_key is None and parent is not expanding:
+            push_frontier(parent)
+        if not parent.children:
+            push_leaf(parent)
+        backup(parent)
+        return True
+
+    def backup(node):
+        # Once every successor has been generated at least once, a node is
+        # as good as its best child, in memory or forgotten
+        while node is not None and all(a in node.forgotten for a in node.pending):
+            f = min([child.f for child in node.children] + list(node.forgotten.values()),
+                    default=np.inf)
+            if f == node.f:
+                break
+            node.f = f
+            if node.frontier_key is not None:
+                push_frontier(node)
+            if node.leaf_key is not None:
+                push_leaf(node)
+            node = node.parent
+
+    root = Node(problem.initial)
+    add(root, h(root))
+    used = 1
+    while True:
+        node = pop(frontier, 'frontier_key')
+        if node is None or node.f == np.inf:
+            return None
+        if problem.goal_test(node.state):
+            return node
+        if not node.pending:
+            backup(node)
+            continue
+
+        action = node.pending.popleft()
+        child = node.child_node(problem, action)
+        f = max(node.f, child.path_cost + h(child), node.forgotten.pop(action, 0))
+        # Cycles, and paths too long to fit in memory, lead nowhere
+        if on_path(node, child.state) or \
+                (child.depth >= max_nodes - 1 and not problem.goal_test(child.state)):
+            f = np.inf
+        if f < np.inf:
+            if used >= max_nodes and drop_worst_leaf(node):
+                used -= 1
+            node.children.append(child)
+            node.leaf_key = None
+            add(child, f)
+            used += 1
+
+        backup(node)
+        if node.pending:
+            push_frontier(node)
+
+
 def hill_climbing(problem):
     """
     [Figure 4.2]
@@ -691,6 +969,102 @@ def simulated_annealing_full(problem, schedule=exp_schedule()):
             current = next_choice
 
 
+def multi_start_search(problem, method='annealing', runs=8, starts=None, schedules=(20, 0.005, 100),
+                       seeds=None, rounds=1, share=True, processes=None):
+    """Run several independent local searches at once and keep the best.
+
+    method: 'annealing' (simulated_annealing), 'hill_climbing', or 'boggle'
+        (boggle_hill_climbing; problem is then the starting board, or None
+        for random boards). Values come from problem.value, or the number
+        of words on a Boggle board; higher is better.
+    runs: number of independent runs, shared out over a Pool of processes
+        worker processes (default one per CPU; 0 runs them here). problem
+        and the states must be picklable.
+    starts: the starting state of each run (default problem.initial).
+    schedules: exp_schedule parameters (k, lam, limit), one tuple for every
+        run or a list with one per run. Hill climbing ignores them; Boggle
+        makes limit mutations.
+    seeds: the random seed of each run (default drawn from random).
+    rounds: split every schedule into this many legs. With share, all runs
+        carry on from the best state found so far after each leg.
+
+    Returns (best_state, best_value, stats), stats holding one dict per
+    run with its seed, schedule, start, final and best values and seconds.
+    """
+    if method not in ('annealing', 'hill_climbing', 'boggle'):
+        raise ValueError("Unknown local search method: %r" % (method,))
+    if isinstance(schedules[0], (int, float)):
+        schedules = [tuple(schedules)] * runs
+    if starts is None:
+        starts = [problem if method == 'boggle' else problem.initial] * runs
+    if seeds is None:
+        seeds = [random.randrange(2 ** 32) for _ in range(runs)]
+    schedules, states, seeds = list(schedules), list(starts), list(seeds)
+    if not len(schedules) == len(states) == len(seeds) == runs:
+        raise ValueError("Need one schedule, start and seed per run")
+
+    stats = [dict(seed=seed, schedule=schedule, start=None, final=None, best=-np.inf, time=0.0)
+             for seed, schedule in zip(seeds, schedules)]
+    best_state, best_value = None, -np.inf
+    pool = Pool(processes) if processes != 0 else None
+    try:
+        for leg in range(rounds):
+            tasks = []
+            for i in range(runs):
+                limit = schedules[i][2]
+                offset, end = leg * limit // rounds, (leg + 1) * limit // rounds
+                tasks.append((method, problem, states[i], seeds[i] * 1000003 + leg,
+                              schedules[i], offset, end - offset))
+            results = pool.map(local_search_run, tasks) if pool else map(local_search_run, tasks)
+
+            for i, (state, value, start_value, seconds) in enumerate(results):
+                run = stats[i]
+                if leg == 0:
+                    run['start'] = start_value
+                run['final'] = value
+                run['best'] = max(run['best'], value)
+                run['time'] += seconds
+                states[i] = state
+                if value > best_value:
+                    best_state, best_value = state, value
+            if share:
+                states = [best_state] * runs
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return best_state, best_value, stats
+
+
+def local_search_run(task):
+    """One leg of a multi_start_search run (in a worker process).
+    Returns (final state, its value, starting value, seconds).
+    The leg is seeded on its own; the caller's random state is restored
+    afterwards, since with processes=0 it runs in the caller's process."""
+    method, problem, state, seed, (k, lam, limit), offset, steps = task
+    saved = random.getstate()
+    random.seed(seed)
+    try:
+        start = time.perf_counter()
+        if method == 'boggle':
+            board = list(state) if state else random_boggle()
+            start_value = len(BoggleFinder().set_board(list(board)))
+            board, value = boggle_hill_climbing(board, ntimes=steps, verbose=False)
+            return board, value, start_value, time.perf_counter() - start
+
+        problem = copy.copy(problem)
+        problem.initial = state
+        start_value = problem.value(state)
+        if method == 'annealing':
+            schedule = exp_schedule(k, lam, limit)
+            state = simulated_annealing(problem, lambda t: schedule(offset + t) if t < steps else 0)
+        else:
+            state = hill_climbing(problem)
+        return state, problem.value(state), start_value, time.perf_counter() - start
+    finally:
+        random.setstate(saved)
+
+
 def and_or_graph_search(problem):
     """[Figure 4.11]Used when the environment is nondeterministic and completely observable.
     Contains OR nodes where the agent is free to choose any action.
@@ -922,17 +1296,101 @@ def genetic_search(problem, ngen=1000, pmut=0.1, n=20):
     return genetic_algorithm(states[:n], problem.value, ngen, pmut)
 
 
-def genetic_algorithm(population, fitness_fn, gene_pool=[0, 1], f_thres=None, ngen=1000, pmut=0.1):
-    """[Figure 4.8]"""
+def genetic_algorithm(population, fitness_fn, gene_pool=[0, 1], f_thres=None, ngen=1000, pmut=0.1,
+                      pool=None, seed=None):
+    """[Figure 4.8]
+    Runs on a GAPopulation: the whole generation is selected, recombined
+    and mutated at once with NumPy, and fitness_fn is called once per
+    individual per generation. pool, if given (a multiprocessing.Pool or a
+    concurrent.futures executor), computes the fitness values with its map
+    method, so fitness_fn must then be picklable. seed fixes the NumPy
+    random numbers; by default they are seeded from the random module."""
+    if seed is None:
+        seed = random.getrandbits(64)
+    population = GAPopulation(population, gene_pool, np.random.default_rng(seed))
+    fitness = population.evaluate(fitness_fn, pool)
     for i in range(ngen):
-        population = [mutate(recombine(*select(2, population, fitness_fn)), gene_pool, pmut)
-                      for i in range(len(population))]
+        population.breed(fitness, pmut)
+        fitness = population.evaluate(fitness_fn, pool)
+
+        if f_thres and fitness.max() >= f_thres:
+            return population.individual(fitness.argmax())
+
+    return population.individual(fitness.argmax())
+
+
+class GAPopulation:
+    """The individuals of a genetic algorithm as rows of a 2-D NumPy array.
+    Genes are stored as indices into self.values, the gene pool followed by
+    any other values the starting individuals hold; mutation only draws
+    from the gene pool. All individuals must have the same length."""
+
+    def __init__(self, population, gene_pool, rng=None):
+        self.rng = rng or np.random.default_rng()
+        self.values = list(gene_pool)
+        index = {gene: i for i, gene in enumerate(self.values)}
+        self.pool_size = len(self.values)
+        rows = []
+        for individual in population:
+            row = []
+            for gene in individual:
+                if gene not in index:
+                    index[gene] = len(self.values)
+                    self.values.append(gene)
+                row.append(index[gene])
+            rows.append(row)
+        if len(set(map(len, rows))) > 1:
+            raise ValueError("All individuals must have the same length")
+        self.genes = np.array(rows, dtype=np.int64).reshape(len(rows), -1)
+
+    def __len__(self):
+        return len(self.genes)
+
+    def individual(self, i):
+        """Return individual i as a list of genes."""
+        return [self.values[g] for g in self.genes[i].tolist()]
 
-        fittest_individual = fitness_threshold(fitness_fn, f_thres, population)
-        if fittest_individual:
-            return fittest_individual
+    def individuals(self):
+        return [self.individual(i) for i in range(len(self))]
 
-    return max(population, key=fitness_fn)
+    def evaluate(self, fitness_fn, pool=None):
+        """Return the fitness of every individual as an array."""
+        individuals = self.individuals()
+        if pool is None:
+            fitness = list(map(fitness_fn, individuals))
+        else:
+            chunksize = max(1, len(individuals) // 32)
+            fitness = list(pool.map(fitness_fn, individuals, chunksize=chunksize))
+        return np.array(fitness, dtype=float)
+
+    def select(self, fitness, r=2):
+        """Return an (n, r) array of parents drawn with probability
+        proportional to fitness (uniformly if every fitness is 0).
+        Negative fitness counts as 0, so those individuals are not picked."""
+        fitness = np.maximum(fitness, 0)
+        total = fitness.sum()
+        p = fitness / total if total > 0 else None
+        return self.rng.choice(len(self), size=(len(self), r), p=p)
+
+    def recombine(self, parents):
+        """Return single-point crossovers of the parent pairs, as recombine does."""
+        x, y = self.genes[parents[:, 0]], self.genes[parents[:, 1]]
+        cut = self.rng.integers(0, self.genes.shape[1], size=len(parents))
+        return np.where(np.arange(self.genes.shape[1]) < cut[:, None], x, y)
+
+    def mutate(self, genes, pmut):
+        """With probability pmut, set one random gene of each individual to
+        a random value from the gene pool, as mutate does."""
+        n, length = genes.shape
+        mutants = np.flatnonzero(self.rng.random(n) < pmut)
+        genes[mutants, self.rng.integers(0, length, size=len(mutants))] = \
+            self.rng.integers(0, self.pool_size, size=len(mutants))
+        return genes
+
+    def breed(self, fitness, pmut):
+        """Replace the population with the next generation."""
+        if self.genes.shape[1]:
+            self.genes = self.mutate(self.recombine(self.select(fitness)), pmut)
 
 
 def fitness_threshold(fitness_fn, f_thres, population):
@@ -1057,12 +1515,172 @@ class Graph:
         nodes = s1.union(s2)
         return list(nodes)
 
+    def min_edge(self):
+        """Return the length of the shortest link (inf if there are none)."""
+        return min((d for links in self.graph_dict.values() for d in links.values()),
+                   default=np.inf)
+
 
 def UndirectedGraph(graph_dict=None):
     """Build a Graph where every edge (including future ones) goes both ways."""
     return Graph(graph_dict=graph_dict, directed=False)
 
 
+class CSRGraph:
+    """A read-only graph in compressed sparse row form, for graphs too big
+    to keep as a dict of dicts. Nodes are numbered 0..n-1 (self.node_list,
+    and self.ids back from a node to its number); the links out of node i
+    go to indices[indptr[i]:indptr[i + 1]], with their lengths in the same
+    slice of weights. Lengths must be numbers. get(), nodes() and
+    min_edge() answer as in Graph, so GraphProblem and the searches can use
+    either; the node list and the shortest link are worked out once.
+        g = CSRGraph(romania_map)
+    copies a Graph (keeping its link order and locations), and
+    CSRGraph.from_edges builds one straight from arrays of links."""
+
+    def __init__(self, graph=None, directed=None, locations=None):
+        graph_dict = graph.graph_dict if isinstance(graph, Graph) else (graph or {})
+        if directed is None:
+            directed = getattr(graph, 'directed', True)
+        if locations is None:
+            locations = getattr(graph, 'locations', None)
+        nodes = list(graph_dict)
+        ids = {node: i for i, node in enumerate(nodes)}
+        sources, targets, weights = [], [], []
+        for a, links in graph_dict.items():
+            for b, d in links.items():
+                if b not in ids:
+                    ids[b] = len(nodes)
+                    nodes.append(b)
+                sources.append(ids[a])
+                targets.append(ids[b])
+                weights.append(d)
+        self._build(nodes, ids, sources, targets, weights, directed, locations)
+
+    @classmethod
+    def from_edges(cls, nodes, sources, targets, weights, directed=True, locations=None):
+        """Build a graph from parallel arrays of links: sources[k] and
+        targets[k] are positions in nodes, weights[k] the length. An
+        undirected graph gets each link in both directions."""
+        graph = cls.__new__(cls)
+        nodes = list(nodes)
+        sources, targets = np.asarray(sources), np.asarray(targets)
+        weights = np.asarray(weights)
+        if not directed:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+            weights = np.concatenate([weights, weights])
+        graph._build(nodes, {node: i for i, node in enumerate(nodes)},
+                     sources, targets, weights, directed, locations)
+        return graph
+
+    def _build(self, nodes, ids, sources, targets, weights, directed, locations):
+        self.node_list, self.ids = nodes, ids
+        self.directed = directed
+        if locations is not None:
+            self.locations = locations
+        weights = np.asarray(weights)
+        if weights.dtype.kind not in 'iuf':
+            if len(weights):
+                raise ValueError("CSRGraph needs numeric link lengths")
+            weights = weights.astype(np.int64)
+        index_type = np.int32 if len(nodes) < 2 ** 31 else np.int64
+        sources = np.asarray(sources, dtype=np.int64)
+        # A stable sort by source keeps each node's links in their order
+        order = np.argsort(sources, kind='stable')
+        self.indices = np.asarray(targets, dtype=index_type)[order]
+        self.weights = weights[order]
+        counts = np.bincount(sources, minlength=len(nodes))
+        self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._min_edge = self.weights.min().item() if len(self.weights) else np.inf
+        # Memoryviews read single items and slices as Python numbers much
+        # faster than NumPy indexing does
+        self._indptr = memoryview(self.indptr)
+        self._indices = memoryview(np.ascontiguousarray(self.indices))
+        self._weights = memoryview(np.ascontiguousarray(self.weights))
+
+    def get(self, a, b=None):
+        """Return a link distance or a dict of {node: distance} entries,
+        as Graph.get does (without adding unknown nodes)."""
+        i = self.ids.get(a)
+        if i is None:
+            return {} if b is None else None
+        start, end = self._indptr[i], self._indptr[i + 1]
+        if b is None:
+            nodes = self.node_list
+            return dict(zip([nodes[j] for j in self._indices[start:end].tolist()],
+                            self._weights[start:end].tolist()))
+        j = self.ids.get(b)
+        if j is None:
+            return None
+        # The last of repeated links wins, as in a dict
+        for k in range(end - 1, start - 1, -1):
+            if self._indices[k] == j:
+                return self._weights[k]
+        return None
+
+    def nodes(self):
+        """Return the list of nodes (shared, so do not change it)."""
+        return self.node_list
+
+    def min_edge(self):
+        """Return the length of the shortest link (inf if there are none)."""
+        return self._min_edge
+
+
+class GridIndex:
+    """Buckets 2-D points into square cells so the nearest neighbors of a
+    point can be found without scanning every point. The points of each
+    cell are stored together in NumPy arrays (self.order, cut up by
+    self.start), and a query searches rings of cells outward from the
+    point's own cell until no unseen cell can hold anything closer."""
+
+    def __init__(self, points, cell_size=None):
+        self.points = list(points)
+        xy = np.array(self.points, dtype=float).reshape(-1, 2)
+        low = xy.min(axis=0) if len(xy) else np.zeros(2)
+        span = xy.max(axis=0) - low if len(xy) else np.zeros(2)
+        if cell_size is None:
+            # About two points per cell
+            cell_size = np.sqrt(2 * max(span[0], 1) * max(span[1], 1) / max(len(xy), 1))
+        self.cell_size = float(cell_size)
+        cells = ((xy - low) // self.cell_size).astype(np.int64)
+        self.ncols, self.nrows = (cells.max(axis=0) + 1) if len(xy) else (0, 0)
+        self.cols, self.rows = cells[:, 0].tolist(), cells[:, 1].tolist()
+        cell = cells[:, 1] * self.ncols + cells[:, 0]
+        self.order = np.argsort(cell, kind='stable').tolist()
+        counts = np.bincount(cell, minlength=self.ncols * self.nrows)
+        self.start = np.concatenate([[0], np.cumsum(counts)]).tolist()
+
+    def ring(self, col, row, r):
+        """Yield the points in the cells exactly r cells away from (col, row)."""
+        order, start, ncols = self.order, self.start, self.ncols
+        for c in range(max(col - r, 0), min(col + r, ncols - 1) + 1):
+            edge = c == col - r or c == col + r
+            for rr in range(max(row - r, 0), min(row + r, self.nrows - 1) + 1):
+                if edge or rr == row - r or rr == row + r:
+                    cell = rr * ncols + c
+                    yield from order[start[cell]:start[cell + 1]]
+
+    def nearest(self, i, skip=lambda j: False):
+        """Return the index of the point nearest to point i, other than the
+        points j for which skip(j) is true; the lowest index wins ties, as
+        with min() over the points in order. None if every point is skipped."""
+        here = self.points[i]
+        col, row = self.cols[i], self.rows[i]
+        best, best_distance = None, np.inf
+        for r in range(max(self.ncols, self.nrows)):
+            for j in self.ring(col, row, r):
+                if skip(j):
+                    continue
+                d = distance(self.points[j], here)
+                if d < best_distance or (d == best_distance and j < best):
+                    best, best_distance = j, d
+            # Cells further out are more than r cells (r * cell_size) away
+            if best_distance < r * self.cell_size * (1 - 1e-9):
+                break
+        return best
+
+
 def RandomGraph(nodes=list(range(10)), min_links=2, width=400, height=300,
                 curvature=lambda: random.uniform(1.1, 1.5)):
     """Construct a random graph, with the specified nodes, and random links.
@@ -1070,24 +1688,25 @@ def RandomGraph(nodes=list(range(10)), min_links=2, width=400, height=300,
     Then each node is connected to the min_links nearest neighbors.
     Because inverse links are added, some nodes will have more connections.
     The distance between nodes is the hypotenuse times curvature(),
-    where curvature() defaults to a random number between 1.1 and 1.5."""
+    where curvature() defaults to a random number between 1.1 and 1.5.
+    Nearest neighbors come from a GridIndex, which picks the same ones
+    (and so builds the same graph) as scanning all nodes would."""
     g = UndirectedGraph()
     g.locations = {}
+    nodes = list(nodes)
     # Build the cities
     for node in nodes:
         g.locations[node] = (random.randrange(width), random.randrange(height))
+    index = GridIndex([g.locations[node] for node in nodes])
     # Build roads from each city to at least min_links nearest neighbors.
     for i in range(min_links):
-        for node in nodes:
-            if len(g.get(node)) < min_links:
+        for k, node in enumerate(nodes):
+            links = g.get(node)
+            if len(links) < min_links:
                 here = g.locations[node]
-
-                def distance_to_node(n):
-                    if n is node or g.get(node, n):
-                        return np.inf
-                    return distance(g.locations[n], here)
-
-                neighbor = min(nodes, key=distance_to_node)
+                j = index.nearest(k, lambda j: nodes[j] is node or links.get(nodes[j]))
+                # With every node linked already, min() used to return the first
+                neighbor = nodes[0] if j is None else nodes[j]
                 d = distance(g.locations[neighbor], here) * curvature()
                 g.connect(node, neighbor, int(d))
     return g
@@ -1196,21 +1815,28 @@ class GraphProblem(Problem):
 
     def find_min_edge(self):
         """Find minimum value of edges."""
-        m = np.inf
-        for d in self.graph.graph_dict.values():
-            local_min = min(d.values())
-            m = min(m, local_min)
-
-        return m
+        return self.graph.min_edge()
+
+    def goal_distances(self):
+        """Return {node: int straight-line distance to the goal} for every
+        node with a location, computed in one NumPy pass on first use (so
+        later changes to graph.locations are not seen)."""
+        if getattr(self, '_goal_distances', None) is None:
+            locs = self.graph.locations
+            xy = np.array(list(locs.values()), dtype=float).reshape(-1, 2)
+            goal_x, goal_y = locs[self.goal]
+            d = np.hypot(xy[:, 0] - goal_x, xy[:, 1] - goal_y).astype(np.int64)
+            self._goal_distances = dict(zip(locs.keys(), d.tolist()))
+        return self._goal_distances
 
     def h(self, node):
         """h function is straight-line distance from a node's state to goal."""
         locs = getattr(self.graph, 'locations', None)
         if locs:
             if type(node) is str:
-                return int(distance(locs[node], locs[self.goal]))
+                return self.goal_distances()[node]
 
-            return int(distance(locs[node.state], locs[self.goal]))
+            return self.goal_distances()[node.state]
         else:
             return np.inf
 
@@ -1240,6 +1866,9 @@ class NQueensProblem(Problem):
     a value of r in the c-th entry means there is a queen at column c,
     row r, and a value of -1 means that the c-th column has not been
     filled in yet. We fill in columns left to right.
+    Rows and the two diagonal families are tracked in flat arrays, so
+    actions, goal_test and h take O(N) time instead of O(N^2); for very
+    large N use min_conflicts instead of a tree search.
     >>> depth_first_tree_search(NQueensProblem(8))
     <Node (7, 3, 0, 2, 5, 1, 6, 4)>
     """
@@ -1254,8 +1883,10 @@ class NQueensProblem(Problem):
             return []  # All columns filled; no successors
         else:
             col = state.index(-1)
+            rows, up, down = self.occupied(state, col)
+            offset = self.N - 1 - col
             return [row for row in range(self.N)
-                    if not self.conflicted(state, row, col)]
+                    if not (rows[row] or up[row + offset] or down[row + col])]
 
     def result(self, state, row):
         """Place the next queen at the given row."""
@@ -1264,6 +1895,17 @@ class NQueensProblem(Problem):
         new[col] = row
         return tuple(new)
 
+    def occupied(self, state, ncols):
+        """Return (rows, up, down) bytearrays marking the rows, the
+        row - col + N - 1 diagonals and the row + col diagonals taken by
+        the queens in the first ncols columns."""
+        N = self.N
+        rows, up, down = bytearray(N), bytearray(2 * N - 1), bytearray(2 * N - 1)
+        for c in range(ncols):
+            r = state[c]
+            rows[r] = up[r - c + N - 1] = down[r + c] = 1
+        return rows, up, down
+
     def conflicted(self, state, row, col):
         """Would placing a queen at (row, col) conflict with anything?"""
         return any(self.conflict(row, col, state[c], c)
@@ -1280,19 +1922,102 @@ class NQueensProblem(Problem):
         """Check if all columns filled, no conflicts."""
         if state[-1] == -1:
             return False
-        return not any(self.conflicted(state, state[col], col)
-                       for col in range(len(state)))
+        # No conflicts means every row and every diagonal is used once
+        N = len(state)
+        return (len(set(state)) == N and
+                len(set(r - c for c, r in enumerate(state))) == N and
+                len(set(r + c for c, r in enumerate(state))) == N)
 
     def h(self, node):
         """Return number of conflicting queens for a given node"""
+        # Each ordered pair sharing a row or a diagonal counts once; two
+        # different squares cannot share two of these lines at once
         num_conflicts = 0
-        for (r1, c1) in enumerate(node.state):
-            for (r2, c2) in enumerate(node.state):
-                if (r1, c1) != (r2, c2):
-                    num_conflicts += self.conflict(r1, c1, r2, c2)
+        for line in (node.state,
+                     [r - c for c, r in enumerate(node.state)],
+                     [r + c for c, r in enumerate(node.state)]):
+            num_conflicts += sum(k * (k - 1) for k in collections.Counter(line).values())
 
         return num_conflicts
 
+    def min_conflicts(self, max_steps=None, seed=None):
+        """Solve by local search over permutations [Sosic and Gu 1991]: a
+        greedy start places each queen on a free diagonal when up to 256
+        random tries find one, then queens still in conflict swap rows with
+        random others whenever that does not add diagonal conflicts.
+        Every step is O(1), so N in the millions is practical.
+        Returns a full state, or None if max_steps swaps (by default
+        100 * N + 10000, far more than a solvable board needs) were not
+        enough or N is 2 or 3, which have no solution."""
+        N = self.N
+        if N in (2, 3):
+            return None
+        if max_steps is None:
+            max_steps = 100 * N + 10000
+        rng = random.Random(seed)
+        rows = list(range(N))
+        up, down = [0] * (2 * N - 1), [0] * (2 * N - 1)
+        for c in range(N):
+            for attempt in range(256):
+                j = rng.randrange(c, N)
+                r = rows[j]
+                if not up[r - c + N - 1] and not down[r + c]:
+                    break
+            rows[c], rows[j] = rows[j], rows[c]
+            up[r - c + N - 1] += 1
+            down[r + c] += 1
+
+        def in_conflict(c):
+            r = rows[c]
+            return up[r - c + N - 1] > 1 or down[r + c] > 1
+
+        def move(c, r, step):
+            # Take the queen of column c off row r (step -1) or put it on
+            # (step 1); return the change in the number of conflicts
+            u, d = r - c + N - 1, r + c
+            change = 0
+            if step < 0:
+                change -= (up[u] > 1) + (down[d] > 1)
+            else:
+                change += (up[u] > 0) + (down[d] > 0)
+            up[u] += step
+            down[d] += step
+            return change
+
+        pending = [c for c in range(N) if in_conflict(c)]
+        steps = stuck = 0
+        while pending:
+            i = pending.pop()
+            if not in_conflict(i):
+                continue
+            if steps >= max_steps:
+                return None
+            steps += 1
+            j = rng.randrange(N)
+            if j == i:
+                pending.append(i)
+                continue
+            ri, rj = rows[i], rows[j]
+            change = move(i, ri, -1) + move(j, rj, -1) + move(i, rj, 1) + move(j, ri, 1)
+            stuck = 0 if change < 0 else stuck + 1
+            # Sideways swaps are fine; a worse one only gets out of a
+            # local minimum after a long run without progress
+            if change <= 0 or stuck > 2 * N + 20:
+                if change > 0:
+                    stuck = 0
+                rows[i], rows[j] = rj, ri
+                for c in (i, j):
+                    if in_conflict(c):
+                        pending.append(c)
+            else:
+                # Put both queens back
+                move(i, rj, -1)
+                move(j, ri, -1)
+                move(i, ri, 1)
+                move(j, rj, 1)
+                pending.append(i)
+        return tuple(rows)
+
 
 # ______________________________________________________________________________
 # Inverse Boggle: Search for a high-scoring Boggle board. A good domain for
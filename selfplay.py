@@ -0,0 +1,172 @@
+# Self-play runner: pits two AI configurations against each other to
+# compare their strength and speed.
+
+import argparse
+import random
+import time
+
+from game import Game
+from AI import MinimaxAI
+
+
+def random_opening(game, plies, rng):
+    """Play `plies` random legal moves so repeated games differ."""
+    for _ in range(plies):
+        moves = [(piece, dest)
+                 for piece in game.board.get_all_pieces(game.turn)
+                 for dest in game.get_valid_moves(piece)]
+        if not moves:
+            return
+        piece, (row, col) = rng.choice(moves)
+        game.move(piece, row, col)
+        game.switch_turn()
+
+
+def play_game(red_ai, black_ai, game=None, max_plies=200, positions=None):
+    """Play one game between two AIs.
+
+    If `positions` is a list, the 32-square encoding of every position
+    reached is appended to it.
+
+    Returns:
+        tuple: (winner, plies, totals) where winner is "r", "b" or None for
+        a draw, and totals maps each color to its summed search stats and
+        thinking time.
+    """
+    game = game or Game()
+    players = {"r": red_ai, "b": black_ai}
+    totals = {"r": {"time": 0.0, "moves": 0}, "b": {"time": 0.0, "moves": 0}}
+
+    for ply in range(max_plies):
+        if positions is not None:
+            positions.append(game.board.to_squares())
+        if game.is_game_over():
+            winner = game.get_winner()
+            return {"Red": "r", "Black": "b"}.get(winner), ply, totals
+
+        ai = players[game.turn]
+        start = time.perf_counter()
+        move = ai.choose_move(game)
+        elapsed = time.perf_counter() - start
+
+        side = totals[game.turn]
+        side["time"] += elapsed
+        side["moves"] += 1
+        for name, value in ai.stats.items():
+            side[name] = side.get(name, 0) + value
+
+        if move is None:
+            return ("b" if game.turn == "r" else "r"), ply, totals
+
+        # The AI picks its own capture sequences, like in the UI
+        piece, (row, col), _ = move
+        old_mand = game.mandatory_jumps
+        game.mandatory_jumps = False
+        game.move(piece, row, col)
+        game.mandatory_jumps = old_mand
+        game.switch_turn()
+
+    return None, max_plies, totals
+
+
+def match(make_a, make_b, games=10, opening_plies=4, max_plies=200, seed=0,
+          corpus=None):
+    """Play `games` games between two AI factories, alternating colors.
+
+    Each random opening is played twice with colors swapped, so neither
+    side profits from a lucky opening.
+
+    Args:
+        make_a: Callable taking a color and returning an AI.
+        make_b: Callable taking a color and returning an AI.
+        corpus: Optional text file; every position played is written to it
+            with the game result, in the format tuning.py reads.
+
+    Returns:
+        dict: Wins, draws and losses from A's point of view, plus summed
+        search stats for each side.
+    """
+    rng = random.Random(seed)
+    result = {"wins": 0, "draws": 0, "losses": 0, "a": {}, "b": {}}
+    opening_seed = None
+
+    for i in range(games):
+        # A new opening for every pair of games
+        if i % 2 == 0:
+            opening_seed = rng.random()
+        a_color = "r" if i % 2 == 0 else "b"
+        b_color = "b" if a_color == "r" else "r"
+
+        game = Game()
+        random_opening(game, opening_plies, random.Random(opening_seed))
+        ais = {a_color: make_a(a_color), b_color: make_b(b_color)}
+        positions = [] if corpus is not None else None
+        winner, _, totals = play_game(ais["r"], ais["b"], game, max_plies, positions)
+
+        if corpus is not None:
+            # Result from red's point of view
+            outcome = {"r": "1.0", "b": "0.0", None: "0.5"}[winner]
+            corpus.writelines(f"{squares} {outcome}\n" for squares in positions)
+
+        if winner is None:
+            result["draws"] += 1
+        elif winner == a_color:
+            result["wins"] += 1
+        else:
+            result["losses"] += 1
+
+        for side, color in (("a", a_color), ("b", b_color)):
+            for name, value in totals[color].items():
+                result[side][name] = result[side].get(name, 0) + value
+
+    return result
+
+
+def print_report(result):
+    """Print the match score and per-move search cost for both sides."""
+    print(f"A: +{result['wins']} ={result['draws']} -{result['losses']}")
+    for side in ("a", "b"):
+        stats = result[side]
+        moves = max(stats.get("moves", 0), 1)
+        print(f"{side.upper()}: {stats.get('nodes', 0) / moves:.0f} nodes/move, "
+              f"{1000 * stats.get('time', 0.0) / moves:.1f} ms/move")
+        extras = {name: value for name, value in stats.items()
+                  if name not in ("nodes", "time", "moves") and value}
+        if extras:
+            print("   " + ", ".join(f"{name}={value}" for name, value in sorted(extras.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play engine A against engine B and report the result.")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lmr", action="store_true",
+                        help="enable late move reductions for engine A")
+    parser.add_argument("--multi-cut", action="store_true",
+                        help="enable multi-cut pruning for engine A")
+    parser.add_argument("--corpus", metavar="FILE",
+                        help="append every position and its result to FILE")
+    args = parser.parse_args()
+
+    def make_a(color):
+        return MinimaxAI(color, args.depth, lmr=args.lmr, multi_cut=args.multi_cut)
+
+    def make_b(color):
+        return MinimaxAI(color, args.depth)
+
+    corpus = open(args.corpus, "a") if args.corpus else None
+    try:
+        result = match(make_a, make_b, args.games, args.opening_plies,
+                       args.max_plies, args.seed, corpus)
+    finally:
+        if corpus is not None:
+            corpus.close()
+    print_report(result)
+
+
+if __name__ == "__main__":
+    main()
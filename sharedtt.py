@@ -0,0 +1,161 @@
+# Transposition table in shared memory, so every MinimaxAI process on the
+# machine can reuse the others' search results.
+#
+# The table is a fixed array of 24-byte entries in a
+# multiprocessing.shared_memory block. Each entry holds three 64-bit words:
+# a check word, the data word (depth, bound type and best move) and the
+# score as a float64. The check word is the position hash XOR-ed with the
+# other two. Readers and writers take no locks: an entry torn by two
+# processes writing at once no longer XORs back to the key being probed,
+# so it simply reads as a miss.
+#
+# Usage:
+#     tt = SharedTranspositionTable(1 << 20)       # in the parent
+#     MinimaxAI("r", 6, tt=tt.name)                # in any process
+
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+ENTRY_SIZE = 24
+
+# Bound types stored with each score
+EXACT = 1
+LOWER = 2  # The search failed high: the score is at least this
+UPPER = 3  # The search failed low: the score is at most this
+
+_FLOAT = struct.Struct("<d")
+_BITS = struct.Struct("<Q")
+_HAS_MOVE = 1 << 20
+_MASK64 = (1 << 64) - 1
+
+
+def pack_entry(depth, flag, score, move):
+    """Pack a search result into (data word, score word).
+
+    Data layout: bits 0-7 depth, 8-9 flag, 10-14 from square, 15-19 to
+    square, 20 set when there is a move. The flag is never 0, so a used
+    entry always has a non-zero data word.
+    """
+    data = min(depth, 255) | flag << 8
+    if move is not None:
+        start, dest = move
+        data |= start << 10 | dest << 15 | _HAS_MOVE
+    return data, _BITS.unpack(_FLOAT.pack(score))[0]
+
+
+def unpack_entry(data, score_bits):
+    """Return (depth, flag, score, move) from the two words; move is
+    (from square, to square) as PLAYABLE_SQUARES indices, or None."""
+    move = None
+    if data & _HAS_MOVE:
+        move = (data >> 10 & 31, data >> 15 & 31)
+    return data & 255, data >> 8 & 3, _FLOAT.unpack(_BITS.pack(score_bits))[0], move
+
+
+class SharedTranspositionTable:
+    def __init__(self, entries=1 << 20, name=None, create=True):
+        """Create a new table, or attach to an existing one by name.
+
+        Args:
+            entries (int): Number of entries, rounded up to a power of two
+                (ignored when attaching).
+            name (str): Shared memory name; chosen by the system if None.
+            create (bool): False to attach to the table called `name`.
+        """
+        if create:
+            size = 1
+            while size < entries:
+                size *= 2
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=size * ENTRY_SIZE)
+        else:
+            if name is None:
+                raise ValueError("A name is needed to attach to a table")
+            self.shm = _attach(name)
+        self.owner = create
+        # Attaching may see the size rounded up to whole pages
+        self.size = 1 << (self.shm.size // ENTRY_SIZE).bit_length() - 1
+        self.mask = self.size - 1
+        self.words = self.shm.buf.cast("Q")
+        if create:
+            self.clear()
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a table created by another process."""
+        return cls(name=name, create=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def probe(self, key):
+        """Return (depth, flag, score, move) stored for `key`, or None."""
+        i = (key & self.mask) * 3
+        words = self.words
+        data, score_bits = words[i + 1], words[i + 2]
+        if words[i] ^ data ^ score_bits != key or not data:
+            return None
+        return unpack_entry(data, score_bits)
+
+    def store(self, key, depth, flag, score, move=None):
+        """Store a result, unless the slot holds a deeper one for the same key."""
+        i = (key & self.mask) * 3
+        words = self.words
+        old = words[i + 1]
+        if words[i] ^ old ^ words[i + 2] == key and old & 255 > depth:
+            return
+        data, score_bits = pack_entry(depth, flag, score, move)
+        words[i] = (key ^ data ^ score_bits) & _MASK64
+        words[i + 1] = data
+        words[i + 2] = score_bits
+
+    def clear(self):
+        """Empty the table."""
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        """Detach from the shared memory in this process."""
+        if self.words is not None:
+            self.words.release()
+            self.words = None
+            self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory for every process (the creator's job)."""
+        self.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+    def __getstate__(self):
+        # Other processes receive the name and attach to the same memory
+        return {"name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(name=state["name"], create=False)
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Before 3.13, attaching registers the block with this process's
+    # resource tracker, which unlinks it when the process exits. A process
+    # that did not inherit a tracker from the creator must unregister it.
+    inherited = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+    shm = shared_memory.SharedMemory(name=name)
+    if not inherited:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
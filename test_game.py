@@ -1,5 +1,8 @@
-from game import Game
-from board import Piece
+from game import Game, GameStatus
+from board import Board, Piece
+from history import PositionHistory
+from AI import MinimaxAI
+from copy import deepcopy
 
 '''An attempt at unit tests for the checkers game logic.
    These tests cover basic moves, captures, 
@@ -109,16 +112,17 @@ def test_backward_movement_non_king():
 def test_king_movement():
     game = Game()
 
-    # Promote a piece to king
-    piece = Piece(4, 4, "r", king=True)
-    game.board.board[4][4] = piece
+    # Promote a piece to king (pieces only stand on dark squares)
+    game.board.board = [[0 for _ in range(8)] for _ in range(8)]
+    piece = Piece(4, 3, "r", king=True)
+    game.board.board[4][3] = piece
 
     # Test all diagonal directions
     valid_moves = game.get_valid_moves(piece)
-    assert (3, 3) in valid_moves, "King should move backward-left"
-    assert (3, 5) in valid_moves, "King should move backward-right"
-    assert (5, 3) in valid_moves, "King should move forward-left"
-    assert (5, 5) in valid_moves, "King should move forward-right"
+    assert (3, 2) in valid_moves, "King should move backward-left"
+    assert (3, 4) in valid_moves, "King should move backward-right"
+    assert (5, 2) in valid_moves, "King should move forward-left"
+    assert (5, 4) in valid_moves, "King should move forward-right"
 
 def test_turn_enforcement():
     game = Game()
@@ -192,6 +196,341 @@ def test_multi_jump_mixed_directions():
     valid_moves = game.get_valid_moves(red_piece)
     assert (6, 3) in valid_moves, "Second jump in a different direction should be available"
 
+def test_repetition_draw():
+    game = Game()
+
+    # Two kings shuffling back and forth repeat the same positions
+    game.board.board = [[0 for _ in range(8)] for _ in range(8)]
+    red_king = Piece(0, 1, "r", king=True)
+    black_king = Piece(7, 6, "b", king=True)
+    game.board.board[0][1] = red_king
+    game.board.board[7][6] = black_king
+    game.history = PositionHistory()
+    game.history.push(game.position_key())
+
+    shuffle = [(red_king, (1, 2)), (black_king, (6, 5)),
+               (red_king, (0, 1)), (black_king, (7, 6))]
+    for _ in range(2):
+        assert not game.is_game_over(), "Game should not be over before the repetition"
+        for piece, (row, col) in shuffle:
+            game.move(piece, row, col)
+            game.switch_turn()
+
+    assert game.is_draw(), "Third repetition of a position should be a draw"
+    assert game.is_game_over(), "A drawn game is over"
+    assert game.get_winner() is None, "A drawn game has no winner"
+
+def test_position_history_stack():
+    history = PositionHistory(capacity=2)
+    history.push(1)
+    history.push(2)
+    history.push(3)  # Overwrites key 1
+    assert 1 not in history and history.count(3) == 1
+    assert history.pop() == 3
+    assert 1 in history and len(history) == 2, "Pop should restore the overwritten key"
+    history.push(2, irreversible=True)
+    assert history.count(2) == 2 and history.plies_since_irreversible == 0
+
+def test_negamax_matches_plain_minimax():
+    game = Game()
+    game.move(game.board.board[2][1], 3, 2)
+    game.switch_turn()
+    ai = MinimaxAI("b", max_depth=3)
+
+    # Reference: plain minimax without pruning, scored for black
+    def minimax(state, depth, color):
+        if depth == 0 or state.is_terminal():
+            return ai.evaluate(state)
+        scores = []
+        for piece, dest, captured in ai.get_valid_moves_with_pieces(state, color):
+            next_state = deepcopy(state)
+            next_piece = next_state.board[piece.row][piece.col]
+            next_state.make_move((next_piece, dest, captured))
+            scores.append(minimax(next_state, depth - 1, "r" if color == "b" else "b"))
+        if not scores:
+            return float("-inf") if color == "b" else float("inf")
+        return max(scores) if color == "b" else min(scores)
+
+    move = ai.choose_move(game)
+    assert move is not None, "AI should find a move"
+    assert ai.last_score == minimax(game.board, 3, "b"), "Search should return the minimax value"
+
+def test_forward_pruning_flags():
+    game = Game()
+    ai = MinimaxAI("r", max_depth=6, lmr=True, multi_cut=True)
+    piece, dest, captured = ai.choose_move(game)
+
+    assert dest in game.get_valid_moves(piece), "Pruned search should still pick a legal move"
+    assert ai.stats["lmr_reductions"] > 0, "Late moves should be reduced at depth 6"
+    # Multi-cut needs MC_MIN_DEPTH plies left below the root, so depth 6
+    assert ai.stats["multi_cut_prunes"] > 0, "Multi-cut should prune some nodes at depth 6"
+
+def test_tuning_features_match_evaluate():
+    import numpy as np
+    from tuning import FEATURES, extract_features
+
+    game = Game()
+    game.board.board[2][1] = 0
+    game.board.board[4][3] = Piece(4, 3, "r", king=True)
+    squares = np.frombuffer(game.board.to_squares().encode(), dtype=np.uint8).reshape(1, 32)
+    ai = MinimaxAI("r")
+    weights = np.array([ai.weights[name] for name in FEATURES])
+
+    score = float(extract_features(squares)[0] @ weights)
+    assert abs(score - ai.evaluate(game.board)) < 1e-5, "Features should reproduce the evaluation"
+
+def test_mlp_evaluator_batches():
+    import os
+    import tempfile
+    from nn_eval import MLPEvaluator
+
+    game = Game()
+    boards = [deepcopy(game.board) for _ in range(3)]
+    boards[1].board[2][1] = 0
+    boards[2].board[5][0] = 0
+    evaluator = MLPEvaluator(hidden=8)
+
+    batch = evaluator.evaluate_batch(boards)
+    for board, value in zip(boards, batch):
+        assert abs(evaluator.evaluate(board) - value) < 1e-6, "Batched and single evaluation should agree"
+
+    path = os.path.join(tempfile.mkdtemp(), "mlp.npz")
+    evaluator.save(path)
+    loaded = MLPEvaluator.load(path)
+    assert abs(loaded.evaluate(boards[1]) - batch[1]) < 1e-6, "Weights should survive a save/load round trip"
+
+def test_mcts_reuses_tree():
+    from mcts import MCTSAI
+
+    game = Game()
+    ai = MCTSAI("r", iterations=50, seed=1, max_plies=20)
+    piece, (row, col), _ = ai.choose_move(game)
+    assert (row, col) in game.get_valid_moves(piece), "MCTS should pick a legal move"
+
+    game.move(piece, row, col)
+    game.switch_turn()
+    reply = ai.root.children[0].move
+    game.move(game.board.board[reply[0].row][reply[0].col], *reply[1])
+    game.switch_turn()
+
+    ai.choose_move(game)
+    assert ai.stats["reused_visits"] > 0, "The opponent's reply should be found in the old tree"
+
+    # With no iterations (or no time) the root is still expanded once
+    for ai in (MCTSAI("r", iterations=0, seed=1), MCTSAI("r", time_limit=1e-9, seed=1)):
+        piece, dest, _ = ai.choose_move(Game())
+        assert dest in Game().get_valid_moves(piece), "Should still pick a legal move"
+
+def test_batch_simulator():
+    from batchsim import BatchSimulator, from_board, to_board
+
+    board = Board()
+    assert to_board(*from_board(board)).to_squares() == board.to_squares(), \
+        "Bitboards should round-trip to the same board"
+
+    sim = BatchSimulator(64, seed=0)
+    jumps, steps = sim.legal_moves()
+    assert steps[0].sum() == 7 and not jumps.any(), "Red has 7 opening moves and no captures"
+
+    positions = list(sim.run(max_plies=300))
+    assert positions, "The simulator should yield the start position"
+    assert set(sim.result.tolist()) <= {-1, 0, 1}, "Results are +1, -1 or 0"
+    assert (sim.result[sim.done] != 0).all(), "Finished games have a winner"
+
+def test_analyze_stream():
+    from analyze import analyze_stream, read_positions
+
+    lines = [
+        "rrrrrrrrrrrr........bbbbbbbbbbbb r",
+        '[Event "test"]',
+        "1. 9-13 22-18 2. 10-14 18x9 3. 5x14 *",
+    ]
+    positions = list(read_positions(lines))
+    assert len(positions) == 7, "One position line plus six positions of the game"
+    info, squares, turn = positions[-1]
+    assert (info["game"], info["ply"], turn) == (1, 5, "b"), "Last game position has black to move"
+    assert squares.count("b") == 11, "Black lost one man in the game"
+
+    results = list(analyze_stream(positions[:1] + positions[5:6], depth=2, processes=0))
+    assert results[0][1]["move"] is not None and results[0][1]["nodes"] > 0
+    assert results[1][1]["move"] == "5x14", "Red must recapture"
+
+def test_position_serialization():
+    import random
+    from selfplay import random_opening
+
+    rng = random.Random(1)
+    for plies in (0, 5, 17, 40):
+        game = Game()
+        random_opening(game, plies, rng)
+        game.board.board[7][0] = Piece(7, 0, "r", king=True)
+
+        copy = Game.from_fen(game.to_fen())
+        assert copy.board.to_squares() == game.board.to_squares(), "FEN should round-trip"
+        assert copy.turn == game.turn and copy.to_fen() == game.to_fen()
+
+        packed = game.pack()
+        assert len(packed) == 13, "Packed positions are 13 bytes"
+        copy = Game.unpack(packed)
+        assert copy.position_key() == game.position_key(), "Packing should round-trip"
+
+    board, turn = Board.from_fen("B:R1-3,K12:BK32")
+    assert turn == "b" and board.to_squares() == "rrr........R...................B"
+    for bad in ("R:R1:B1", "X:R1:B2", "R:R33:B1"):
+        try:
+            Board.from_fen(bad)
+            assert False, f"{bad} should be rejected"
+        except ValueError:
+            pass
+
+def test_analysis_cache():
+    import os
+    import tempfile
+    from cache import AnalysisCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        game = Game()
+        with AnalysisCache(path, batch_size=2) as cache:
+            ai = MinimaxAI("r", 3, cache=cache)
+            move = ai.choose_move(game)
+            score = ai.last_score
+            assert ai.stats["cache_hits"] == 0 and ai.stats["nodes"] > 0
+
+        # A new cache object reads the result back from the file
+        with AnalysisCache(path) as cache:
+            ai = MinimaxAI("r", 3, cache=cache)
+            again = ai.choose_move(game)
+            assert ai.stats["cache_hits"] == 1 and ai.stats["nodes"] == 0, "Second search is a hit"
+            assert again == move and ai.last_score == score
+            assert MinimaxAI("r", 4, cache=cache).choose_move(game) is not None
+            assert cache.stats["misses"] == 1, "A deeper search misses the shallow entry"
+
+        with AnalysisCache(path, memory_size=2, batch_size=1, max_entries=3) as cache:
+            for key in range(10):
+                cache.put(key + (1 << 63), 1, float(key), None)
+            assert len(cache) == 3, "Oldest entries are evicted"
+            assert len(cache.memory) == 2, "The LRU front is bounded"
+            assert cache.get((1 << 63) + 9, 1)[1] == 9.0, "Keys above 2**63 round-trip"
+
+            # Rewriting a stored key must not count it twice
+            cache.put((1 << 63) + 9, 7, 1.0, None)
+            assert len(cache) == 3, "An updated key is still one row"
+        with AnalysisCache(path, max_entries=3) as cache:
+            assert len(cache) == 3, "The row count is read back when reopened"
+            assert cache.get((1 << 63) + 9, 7)[1] == 1.0, "The deeper result was stored"
+
+def test_shared_transposition_table():
+    from sharedtt import EXACT, LOWER, SharedTranspositionTable
+
+    with SharedTranspositionTable(1000) as tt:
+        assert len(tt) == 1024, "Size is rounded up to a power of two"
+        key = Game().position_key()
+        tt.store(key, 4, EXACT, 0.25, (9, 13))
+        other = SharedTranspositionTable.attach(tt.name)
+        assert other.probe(key) == (4, EXACT, 0.25, (9, 13)), "Attached tables share entries"
+        other.store(key, 2, LOWER, 1.0)
+        assert tt.probe(key)[0] == 4, "A shallower result does not replace a deeper one"
+        assert tt.probe(key ^ 1) is None
+
+        # A torn entry no longer verifies and reads as a miss
+        i = (key & tt.mask) * 3
+        other.words[i + 2] ^= 1
+        assert tt.probe(key) is None
+        other.close()
+
+        tt.clear()
+        game = Game()
+        plain = MinimaxAI("r", 4)
+        plain.choose_move(game)
+        cached = MinimaxAI("r", 4, tt=tt.name)
+        cached.choose_move(game)
+        assert cached.last_score == plain.last_score, "The table must not change the result"
+        assert cached.stats["nodes"] < plain.stats["nodes"]
+        cached.tt.close()
+
+def test_staged_move_generation():
+    import random
+    from selfplay import random_opening
+
+    rng = random.Random(2)
+    for plies in (0, 8, 20, 30):
+        game = Game()
+        random_opening(game, plies, rng)
+        ai = MinimaxAI(game.turn)
+        ai.killers = [[]]
+        board = game.board
+
+        def as_tuples(moves):
+            return [((p.row, p.col), dest, captured) for p, dest, captured in moves]
+
+        full = as_tuples(ai.get_valid_moves_with_pieces(board, game.turn))
+        staged = as_tuples(ai.generate_moves(board, game.turn, 0))
+        assert sorted(staged) == sorted(full), "Same moves as the eager generator"
+        captures = [move for move in staged if move[2]]
+        assert staged[:len(captures)] == captures, "Captures come before quiet moves"
+
+        # The table move and a killer are tried first
+        quiet = [move for move in full if not move[2]]
+        if len(quiet) >= 2:
+            (start, dest, _), killer = quiet[-1], quiet[-2]
+            tt_move = (start[0] * 4 + start[1] // 2, dest[0] * 4 + dest[1] // 2)
+            ai.killers = [[killer[:2]]]
+            staged = as_tuples(ai.generate_moves(board, game.turn, 0, tt_move))
+            assert staged[0] == quiet[-1], "The table move comes first"
+            assert staged[len(captures) + 1] == killer, "Killers follow the captures"
+            assert sorted(staged) == sorted(full)
+
+def test_only_complete_capture_sequences():
+    board, _ = Board.from_fen("R:R9,12:B14,23,32")
+    ai = MinimaxAI("r")
+
+    # Square 9 is (2, 1): it jumps 14 and then 23, landing on (6, 5)
+    moves = ai.get_piece_moves(board, board.board[2][1])
+    assert moves == [((6, 5), [(3, 2), (5, 4)])], "Only the completed double jump"
+    board_moves = [(dest, captured) for piece, dest, captured in board.get_all_moves("r")
+                   if (piece.row, piece.col) == (2, 1)]
+    assert board_moves == moves, "Board and AI generate the same captures"
+
+    # The piece on square 12 cannot capture, so it keeps its quiet moves
+    assert ai.get_piece_moves(board, board.board[2][7]) == [((3, 6), [])]
+
+def test_game_status():
+    game = Game()
+    assert game.status() == (GameStatus.ONGOING, 12, 12), "Start position is ongoing"
+    assert game.status() is game.status(), "Status is remembered for the same position"
+
+    # Black's only man is blocked in the corner
+    game = Game.from_fen("B:R23,27,28:B32")
+    assert game.status() == (GameStatus.RED_WINS, 3, 1), "Black has no moves"
+    assert game.is_game_over() and game.get_winner() == "Red"
+
+    # Changing the position invalidates the remembered status
+    game.board.board[5][4] = 0
+    assert game.status()[0] == GameStatus.ONGOING, "Black can capture again"
+
+def test_flat_board_storage():
+    board = Board()
+    assert len(board.squares) == 32 and not hasattr(Piece(0, 1, "r"), "__dict__")
+    assert board.board[2][1] is board.squares[8], "The 8x8 view reads the flat squares"
+    assert board.board[0][0] == 0 and [len(list(row)) for row in board.board] == [8] * 8
+
+    board.board[3][2] = Piece(3, 2, "b")
+    assert board.squares[13].color == "b", "Writes through the view land in the squares"
+    try:
+        board.board[3][3] = Piece(3, 3, "r")
+        assert False, "Light squares cannot hold pieces"
+    except ValueError:
+        pass
+
+    copy = deepcopy(board)
+    copy.make_move((copy.board[2][1], (4, 3), [(3, 2)]))
+    assert board.to_squares() != copy.to_squares(), "Copies are independent"
+    assert board.board[2][1].row == 2, "The original piece did not move"
+    piece = board.board[5][0]
+    board_copy, piece_copy = deepcopy((board, piece))
+    assert board_copy.board[5][0] is piece_copy, "deepcopy keeps shared pieces shared"
+
 def run_all_tests():
     test_basic_move()
     test_king_promotion()
@@ -205,6 +544,22 @@ def run_all_tests():
     test_game_over_no_pieces()
     test_game_over_no_moves()
     test_multi_jump_mixed_directions()
+    test_repetition_draw()
+    test_position_history_stack()
+    test_negamax_matches_plain_minimax()
+    test_forward_pruning_flags()
+    test_tuning_features_match_evaluate()
+    test_mlp_evaluator_batches()
+    test_mcts_reuses_tree()
+    test_batch_simulator()
+    test_analyze_stream()
+    test_position_serialization()
+    test_analysis_cache()
+    test_shared_transposition_table()
+    test_staged_move_generation()
+    test_only_complete_capture_sequences()
+    test_game_status()
+    test_flat_board_storage()
     print("All tests passed. Congratualation! :)")
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from patterndb import PatternDatabase
+from search import *
+from utils import PriorityQueue
+
+'''Tests for the search algorithms in search.py and the data structures
+   they use from utils.py.'''
+
+def test_priority_queue_index():
+    queue = PriorityQueue('min', lambda x: x[1])
+    queue.extend([("a", 5), ("b", 2), ("c", 8)])
+    assert ("b", 2) in queue, "Inserted item should be in the queue"
+    assert queue[("c", 8)] == 8, "Lookup should return the item's f value"
+
+    # Deleting only marks the entry; it must not come out of pop
+    del queue[("b", 2)]
+    assert ("b", 2) not in queue, "Deleted item should be gone"
+    assert len(queue) == 2, "Length should not count deleted entries"
+    assert queue.pop() == ("a", 5), "Smallest live item should pop first"
+    assert queue.pop() == ("c", 8), "Last item should pop next"
+    assert len(queue) == 0, "Queue should be empty"
+
+    # Duplicates are tracked separately
+    queue.extend([("d", 1), ("d", 1)])
+    del queue[("d", 1)]
+    assert ("d", 1) in queue, "One copy of a duplicate should remain"
+    try:
+        queue[("x", 0)]
+        assert False, "Missing key should raise KeyError"
+    except KeyError:
+        pass
+
+def test_best_first_decrease_key():
+    # A* and uniform cost search must still find the optimal routes
+    problem = GraphProblem('Arad', 'Bucharest', romania_map)
+    for search in (astar_search, uniform_cost_search):
+        node = search(problem)
+        assert node.solution() == ['Sibiu', 'Rimnicu', 'Pitesti', 'Bucharest'], \
+            "Should find the shortest route from Arad"
+        assert node.path_cost == 418, "Shortest route costs 418"
+
+    puzzle = EightPuzzle((1, 2, 3, 4, 5, 6, 0, 7, 8))
+    assert astar_search(puzzle).solution() == ['RIGHT', 'RIGHT'], \
+        "Should slide the two tiles back"
+
+def test_graph_search_frontier_set():
+    problem = GraphProblem('Arad', 'Bucharest', romania_map)
+    assert breadth_first_graph_search(problem).solution() == ['Sibiu', 'Fagaras', 'Bucharest'], \
+        "BFS should find the route with the fewest steps"
+    assert depth_first_graph_search(problem).solution()[-1] == 'Bucharest', \
+        "DFS should reach the goal"
+
+    # A key function that maps states to compact keys gives the same search
+    puzzle = EightPuzzle((1, 2, 3, 4, 0, 6, 7, 5, 8))
+    pack = lambda state: int(''.join(map(str, state)))
+    assert breadth_first_graph_search(puzzle, key=pack).solution() == ['DOWN', 'RIGHT'], \
+        "Compact keys should not change the search"
+    assert depth_first_graph_search(problem, key=str.lower).solution() == \
+        depth_first_graph_search(problem).solution(), "Compact keys should not change the search"
+
+def test_memory_bounded_astar():
+    # Both should find the same optimal route as A*, SMA* even when it
+    # has to forget most of the tree
+    problem = GraphProblem('Oradea', 'Neamt', romania_map)
+    assert ida_star_search(problem).path_cost == 835, "IDA* should find the optimal route"
+    assert sma_star_search(problem).path_cost == 835, "SMA* should find the optimal route"
+    assert sma_star_search(problem, max_nodes=12).path_cost == 835, \
+        "SMA* should still find it with room for 12 nodes"
+
+    puzzle = EightPuzzle((1, 2, 3, 0, 4, 6, 7, 5, 8))
+    expected = len(astar_search(puzzle).solution())
+    assert len(ida_star_search(puzzle).solution()) == expected, "IDA* should solve the puzzle optimally"
+    assert len(sma_star_search(puzzle, max_nodes=20).solution()) == expected, \
+        "SMA* should solve the puzzle optimally"
+    assert sma_star_search(GraphProblem('Arad', 'Neamt', romania_map), max_nodes=5) is None, \
+        "SMA* cannot reach a goal deeper than its memory"
+
+def test_iterative_depth_limited_search():
+    # A path far deeper than Python's recursion limit
+    line = UndirectedGraph({i: {i + 1: 1} for i in range(3000)})
+    node = depth_limited_search(GraphProblem(0, 3000, line), 3005)
+    assert len(node.solution()) == 3000, "Should follow the whole line"
+    assert depth_limited_search(GraphProblem(0, 3000, line), 10) == 'cutoff', \
+        "Should report a cutoff when the goal is too deep"
+
+    # The options should not change which solution is found
+    problem = GraphProblem('Arad', 'Bucharest', romania_map)
+    expected = iterative_deepening_search(problem).solution()
+    assert iterative_deepening_search(problem, reuse_order=True).solution() == expected, \
+        "Reusing the action order should give the same solution"
+    assert iterative_deepening_search(problem, path_cache=3).solution() == expected, \
+        "Skipping cycles should give the same solution"
+
+    # Going back and forth along the line is the cycle the cache avoids
+    assert len(iterative_deepening_search(GraphProblem(0, 60, line), path_cache=2).solution()) == 60, \
+        "Should walk straight to the goal"
+
+def test_pattern_database():
+    db = PatternDatabase(EightPuzzle.GOAL)
+    assert db.distance(EightPuzzle.GOAL) == 0, "The goal should be 0 moves away"
+    state = (1, 2, 3, 4, 5, 6, 0, 7, 8)
+    assert db.distance(state) == 2, "Two tiles each one move from home"
+
+    # Same optimal solution, far fewer nodes than misplaced tiles
+    state = (8, 6, 7, 2, 5, 4, 3, 0, 1)
+    solution = astar_search(EightPuzzle(state, pattern_db=db)).solution()
+    assert len(solution) == 31, "Hardest 8-puzzle takes 31 moves"
+
+    # Tables saved to disk are loaded back memory-mapped
+    with tempfile.TemporaryDirectory() as directory:
+        goal = FifteenPuzzle.GOAL
+        small = PatternDatabase(goal, groups=[(1, 2), (3, 4)], cache_dir=directory)
+        again = PatternDatabase(goal, groups=[(1, 2), (3, 4)], cache_dir=directory)
+        state = (2, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 0, 15)
+        assert small.distance(state) == again.distance(state) >= 2, \
+            "Reloaded tables should give the same estimates"
+        del small, again
+
+    puzzle = FifteenPuzzle(FifteenPuzzle.GOAL)
+    assert puzzle.actions(puzzle.initial) == ['UP', 'LEFT'], "Blank in the corner has two moves"
+    assert puzzle.check_solvability((1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 0, 15)), \
+        "One move from the goal is solvable"
+    assert not puzzle.check_solvability((2, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0)), \
+        "Two swapped tiles are not solvable"
+
+def test_n_queens():
+    problem = NQueensProblem(8)
+    assert depth_first_tree_search(problem).state == (7, 3, 0, 2, 5, 1, 6, 4), \
+        "Should find the same first solution as before"
+    assert problem.actions((0, 2, -1, -1, -1, -1, -1, -1)) == [4, 5, 6, 7], \
+        "Rows 0-3 are attacked in column 2"
+    assert problem.h(Node((0, 1, 2, 7, 5, 3, 1, 4))) == 8, \
+        "Should count each ordered pair of attacking queens"
+    assert not problem.goal_test((0, 1, 2, 7, 5, 3, 1, 4)), "Attacking queens are not a goal"
+
+    for n in (4, 8, 1000):
+        state = NQueensProblem(n).min_conflicts(seed=1)
+        assert NQueensProblem(n).goal_test(state), "Min-conflicts should solve %d queens" % n
+    for n in (2, 3):
+        assert NQueensProblem(n).min_conflicts() is None, "%d queens have no solution" % n
+    assert NQueensProblem(200).min_conflicts(max_steps=1, seed=1) is None, \
+        "Should give up after max_steps swaps"
+
+def test_grid_index():
+    random.seed(4)
+    points = [(random.randrange(30), random.randrange(20)) for _ in range(300)]
+    index = GridIndex(points)
+    for i in range(0, 300, 7):
+        skip = lambda j: j == i or j % 3 == 0
+        expected = min((j for j in range(300) if not skip(j)),
+                       key=lambda j: distance(points[j], points[i]))
+        assert index.nearest(i, skip) == expected, "Should match a full scan, ties included"
+    assert index.nearest(0, lambda j: True) is None, "Nothing left to find"
+
+    # The first node is linked to its nearest neighbor
+    random.seed(9)
+    graph = RandomGraph(list(range(500)), 3)
+    here = graph.locations[0]
+    nearest = min(range(1, 500), key=lambda j: distance(graph.locations[j], here))
+    assert graph.get(0, nearest) is not None, "Should link the nearest node"
+
+    problem = GraphProblem('Arad', 'Bucharest', romania_map)
+    locations = romania_map.locations
+    for city in locations:
+        assert problem.h(city) == int(distance(locations[city], locations['Bucharest'])), \
+            "Precomputed distances should equal the straight-line distance"
+
+def test_csr_graph():
+    graph = CSRGraph(romania_map)
+    assert graph.get('Arad') == romania_map.get('Arad'), "Links should match the Graph"
+    assert list(graph.get('Arad')) == list(romania_map.get('Arad')), "Link order should be kept"
+    assert graph.get('Arad', 'Sibiu') == 140 and graph.get('Arad', 'Neamt') is None, \
+        "Single links should read like Graph.get"
+    assert sorted(graph.nodes()) == sorted(romania_map.nodes()), "Same nodes"
+    assert GraphProblem('Arad', 'Bucharest', graph).find_min_edge() == 70, "Shortest road is 70"
+
+    for search in (astar_search, uniform_cost_search, breadth_first_graph_search):
+        expected = search(GraphProblem('Lugoj', 'Iasi', romania_map))
+        found = search(GraphProblem('Lugoj', 'Iasi', graph))
+        assert found.solution() == expected.solution() and found.path_cost == expected.path_cost, \
+            "Searches should not notice the backend"
+
+    line = CSRGraph.from_edges(['a', 'b', 'c'], [0, 1], [1, 2], [2.5, 1.5], directed=False)
+    assert line.get('b') == {'a': 2.5, 'c': 1.5}, "Undirected links go both ways"
+    assert line.min_edge() == 1.5, "Shortest link is precomputed"
+    try:
+        CSRGraph(Graph({'A': {'B': 'road'}}))
+        assert False, "Lengths that are not numbers should be refused"
+    except ValueError:
+        pass
+
+def test_genetic_algorithm():
+    target = list("search")
+    letters = list("abcdefghijklmnopqrstuvwxyz")
+    calls = []
+
+    def fitness(individual):
+        calls.append(1)
+        return sum(a == b for a, b in zip(individual, target))
+
+    random.seed(2)
+    population = init_population(100, letters, len(target))
+    best = genetic_algorithm(population, fitness, letters, f_thres=6, ngen=500, pmut=0.3, seed=1)
+    assert best == target, "Should evolve the target word"
+    assert len(calls) % 100 == 0, "Fitness should be computed once per individual per generation"
+
+    # A pool gives the same run for the same seed
+    with ThreadPoolExecutor(2) as pool:
+        pooled = genetic_algorithm(population, fitness, letters, ngen=20, seed=3, pool=pool)
+    assert pooled == genetic_algorithm(population, fitness, letters, ngen=20, seed=3), \
+        "Pooled fitness should not change the result"
+
+    # Negative fitness is allowed and just never selected
+    best = genetic_algorithm([[0, 0], [1, 1], [1, 0]], lambda ind: 3 * sum(ind) - 2,
+                             gene_pool=[0, 1], ngen=3, seed=1)
+    assert len(best) == 2, "Mixed-sign fitness should still evolve"
+    weights = GAPopulation([[0], [1]], [0, 1], np.random.default_rng(0))
+    parents = weights.select(np.array([-2.0, 1.0]))
+    assert (parents == 1).all(), "Only the positive individual should be a parent"
+
+    genes = GAPopulation([[0, 1, 1], [1, 0, 0]], [0, 1])
+    assert genes.genes.shape == (2, 3), "One row per individual"
+    assert genes.individuals() == [[0, 1, 1], [1, 0, 0]], "Rows decode to the individuals"
+
+def test_multi_start_search():
+    # Two hills; runs from the left climb the lower one
+    grid = [[1, 2, 3, 2, 1, 4, 6, 9, 6, 4]]
+    problem = PeakFindingProblem((0, 0), grid, {'N': (0, 1), 'S': (0, -1)})
+    starts = [(0, 0), (0, 1), (0, 2), (0, 9)]
+    state, value, stats = multi_start_search(problem, 'hill_climbing', runs=4, starts=starts,
+                                             seeds=[1, 2, 3, 4], processes=0)
+    assert (state, value) == ((0, 7), 9), "Best run should reach the highest peak"
+    assert [run['final'] for run in stats] == [3, 3, 3, 9], "Each run climbs its own hill"
+    assert [run['start'] for run in stats] == [1, 2, 3, 4], "Starting values are recorded"
+
+    # Worker processes give the same results for the same seeds
+    schedules = [(20, 0.05, 100), (5, 0.01, 300)]
+    found = [multi_start_search(problem, runs=2, starts=starts[:2], schedules=schedules,
+                                seeds=[5, 6], rounds=3, processes=processes)
+             for processes in (0, 2)]
+    assert found[0][:2] == found[1][:2], "A pool should not change the result"
+    assert found[0][2][1]['schedule'] == (5, 0.01, 300), "Stats should name the schedule"
+
+    # Running in-process must not reseed the caller's random numbers
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    multi_start_search(problem, runs=2, starts=starts[:2], seeds=[1, 2], processes=0)
+    assert random.random() == expected, "The caller's random state should be left alone"
+
+    # The Boggle hill climber, with a small word list
+    BoggleFinder.wordlist = Wordlist(io.StringIO("sea tea eat ate seat east teas sate"))
+    try:
+        board, words, stats = multi_start_search(None, 'boggle', runs=3, schedules=(0, 0, 30),
+                                                 seeds=[1, 2, 3], processes=0)
+        assert words == max(run['best'] for run in stats) >= max(run['start'] for run in stats), \
+            "Should keep the board with the most words"
+        assert len(BoggleFinder().set_board(board)) == words, "Word count should match the board"
+    finally:
+        BoggleFinder.wordlist = None
+
+def run_all_tests():
+    test_priority_queue_index()
+    test_best_first_decrease_key()
+    test_graph_search_frontier_set()
+    test_memory_bounded_astar()
+    test_iterative_depth_limited_search()
+    test_pattern_database()
+    test_n_queens()
+    test_grid_index()
+    test_csr_graph()
+    test_genetic_algorithm()
+    test_multi_start_search()
+    print("All tests passed. Congratualation! :)")
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,145 @@
+# Texel-style tuning of the MinimaxAI evaluation weights.
+#
+# A corpus is a text file with one position per line: the 32-square board
+# encoding from Board.to_squares, a space, and the game result from red's
+# point of view (1.0 red won, 0.5 draw, 0.0 black won). selfplay.py can
+# write one with --corpus. The tuner extracts the evaluation features of
+# every position into a NumPy matrix and fits the weights by logistic
+# regression, so that sigmoid(evaluation) predicts the result.
+
+import argparse
+import json
+
+import numpy as np
+
+from AI import DEFAULT_WEIGHTS, WEIGHTS_FILE
+from board import PLAYABLE_SQUARES
+from utils import sigmoid
+
+# Feature order, matching the keys of AI.DEFAULT_WEIGHTS
+FEATURES = ("man", "king", "advance", "edge")
+
+_ROWS = np.array([row for row, _ in PLAYABLE_SQUARES], dtype=np.float32)
+_EDGES = np.array([col in (0, 7) for _, col in PLAYABLE_SQUARES], dtype=np.float32)
+
+
+def load_corpus(path):
+    """Read a corpus file into (squares, results).
+
+    Returns:
+        tuple: squares as an (N, 32) uint8 array of encoding characters and
+        results as an (N,) float32 array.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # Fast path: every line has the same width, so the whole file can be
+    # viewed as a 2-D byte array without a Python loop over lines.
+    width = data.find(b"\n") + 1
+    if width > 33 and len(data) % width == 0:
+        rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, width)
+        if (rows[:, -1] == ord("\n")).all() and (rows[:, 32] == ord(" ")).all():
+            squares = rows[:, :32]
+            results = np.ascontiguousarray(rows[:, 33:-1]).view(f"S{width - 34}")
+            return squares, results.ravel().astype(np.float32)
+
+    squares, results = [], []
+    for line in data.splitlines():
+        if line.strip():
+            board, result = line.split()
+            squares.append(np.frombuffer(board, dtype=np.uint8))
+            results.append(float(result))
+    return np.array(squares, dtype=np.uint8).reshape(-1, 32), np.array(results, dtype=np.float32)
+
+
+def extract_features(squares, chunk_size=1 << 20):
+    """Return the (N, len(FEATURES)) feature matrix, from red's point of view.
+
+    Each feature is red's total minus black's, so the evaluation for red is
+    the dot product of a row with the weight vector.
+    """
+    features = np.empty((len(squares), len(FEATURES)), dtype=np.float32)
+
+    for start in range(0, len(squares), chunk_size):
+        chunk = squares[start:start + chunk_size]
+        red_men = (chunk == ord("r")).astype(np.float32)
+        red_kings = (chunk == ord("R")).astype(np.float32)
+        black_men = (chunk == ord("b")).astype(np.float32)
+        black_kings = (chunk == ord("B")).astype(np.float32)
+        red = red_men + red_kings
+        black = black_men + black_kings
+
+        out = features[start:start + chunk_size]
+        out[:, 0] = red_men.sum(axis=1) - black_men.sum(axis=1)
+        out[:, 1] = red_kings.sum(axis=1) - black_kings.sum(axis=1)
+        # Red advances down the board (row), black up it (7 - row)
+        out[:, 2] = red @ _ROWS - black @ (7 - _ROWS)
+        out[:, 3] = (red - black) @ _EDGES
+
+    return features
+
+
+def fit_weights(features, results, iterations=25, l2=1e-3, tol=1e-8):
+    """Fit weights by logistic regression with Newton's method.
+
+    Minimizes the cross-entropy between sigmoid(features @ w) and the game
+    results. With only a handful of features the Hessian is tiny, and each
+    iteration is a few vectorized passes over the rows.
+
+    Returns:
+        np.ndarray: The fitted weight vector, in logit units.
+    """
+    x = features.astype(np.float64)
+    y = results.astype(np.float64)
+    n = len(x)
+    w = np.zeros(x.shape[1])
+
+    for _ in range(iterations):
+        p = sigmoid(x @ w)
+        gradient = x.T @ (p - y) / n + l2 * w
+        hessian = (x * (p * (1 - p))[:, None]).T @ x / n + l2 * np.eye(len(w))
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < tol:
+            break
+
+    return w
+
+
+def to_weights(w):
+    """Turn a fitted vector into an evaluator weights dict.
+
+    The weights are rescaled so a man is worth 1, which keeps scores in the
+    same units as the hand-written evaluation. Scaling by a positive number
+    does not change which moves the search prefers.
+    """
+    scale = w[0] if w[0] > 0 else 1.0
+    return {name: float(value / scale) for name, value in zip(FEATURES, w)}
+
+
+def save_weights(weights, path=WEIGHTS_FILE):
+    """Write weights where AI.load_weights will find them."""
+    with open(path, "w") as f:
+        json.dump(weights, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fit the evaluation weights to a corpus of game positions.")
+    parser.add_argument("corpus", help="file of '<32 squares> <result>' lines")
+    parser.add_argument("--output", default=WEIGHTS_FILE)
+    parser.add_argument("--iterations", type=int, default=25)
+    args = parser.parse_args()
+
+    squares, results = load_corpus(args.corpus)
+    features = extract_features(squares)
+    weights = to_weights(fit_weights(features, results, args.iterations))
+
+    print(f"{len(results)} positions")
+    for name in FEATURES:
+        print(f"{name:8s} {DEFAULT_WEIGHTS[name]:7.3f} -> {weights[name]:7.3f}")
+    save_weights(weights, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -314,7 +314,7 @@ def leaky_relu_derivative(value, alpha=0.01):
 
 
 def relu(x):
-    return max(0, x)
+    return np.maximum(x, 0)
 
 
 def relu_derivative(value):
@@ -724,10 +724,17 @@ class PriorityQueue:
     order) is returned first.
     If order is 'min', the item with minimum f(x) is
     returned first; if order is 'max', then it is the item with maximum f(x).
-    Also supports dict-like lookup."""
+    Also supports dict-like lookup.
+
+    The heap holds [f(x), x, alive] entries, and self.index maps each item
+    to its live entries, so membership and lookup are O(1). Deleting an
+    item only marks its entry dead (pop skips dead entries), which makes
+    the delete-and-append idiom of a decrease-key O(log n)."""
 
     def __init__(self, order='min', f=lambda x: x):
         self.heap = []
+        self.index = {}
+        self.dead = 0
         if order == 'min':
             self.f = f
         elif order == 'max':  # now item with max f(x)
@@ -737,7 +744,9 @@ class PriorityQueue:
 
     def append(self, item):
         """Insert item at its correct position."""
-        heapq.heappush(self.heap, (self.f(item), item))
+        entry = [self.f(item), item, True]
+        self.index.setdefault(item, []).append(entry)
+        heapq.heappush(self.heap, entry)
 
     def extend(self, items):
         """Insert each item in items at its correct position."""
@@ -747,34 +756,50 @@ class PriorityQueue:
     def pop(self):
         """Pop and return the item (with min or max f(x) value)
         depending on the order."""
-        if self.heap:
-            return heapq.heappop(self.heap)[1]
-        else:
-            raise Exception('Trying to pop from empty PriorityQueue.')
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            if not entry[2]:
+                self.dead -= 1
+                continue
+            item = entry[1]
+            entries = self.index[item]
+            del entries[next(i for i, e in enumerate(entries) if e is entry)]
+            if not entries:
+                del self.index[item]
+            return item
+        raise Exception('Trying to pop from empty PriorityQueue.')
 
     def __len__(self):
         """Return current capacity of PriorityQueue."""
-        return len(self.heap)
+        return len(self.heap) - self.dead
 
     def __contains__(self, key):
         """Return True if the key is in PriorityQueue."""
-        return any([item == key for _, item in self.heap])
+        return key in self.index
 
     def __getitem__(self, key):
         """Returns the first value associated with key in PriorityQueue.
         Raises KeyError if key is not present."""
-        for value, item in self.heap:
-            if item == key:
-                return value
-        raise KeyError(str(key) + " is not in the priority queue")
+        try:
+            return self.index[key][0][0]
+        except KeyError:
+            raise KeyError(str(key) + " is not in the priority queue")
 
     def __delitem__(self, key):
         """Delete the first occurrence of key."""
         try:
-            del self.heap[[item == key for _, item in self.heap].index(True)]
-        except ValueError:
+            entries = self.index[key]
+        except KeyError:
             raise KeyError(str(key) + " is not in the priority queue")
-        heapq.heapify(self.heap)
+        entries.pop(0)[2] = False
+        if not entries:
+            del self.index[key]
+        self.dead += 1
+        # Drop the dead entries once they make up most of the heap
+        if self.dead > len(self.heap) // 2:
+            self.heap = [entry for entry in self.heap if entry[2]]
+            heapq.heapify(self.heap)
+            self.dead = 0
 
 
 # ______________________________________________________________________________